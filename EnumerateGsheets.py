@@ -1,24 +1,56 @@
 import os
+import re
+import csv
 import json
+import time
 import google.auth
 import argparse
+import functools
+import threading
+import concurrent.futures
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 import gspread
+import httplib2
+import google_auth_httplib2
 
 # Load the service account credentials from JSON key file
 SERVICE_ACCOUNT_JSON = 'key.json'
 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = SERVICE_ACCOUNT_JSON
 
-# Initialize the Google Drive API
-credentials, _ = google.auth.default()
-drive_api = build('drive', 'v3', credentials=credentials)
+# Spreadsheet name -> ID lookups are cached on disk so repeated runs skip the Drive search
+ID_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'enumerate_gsheets', 'ids.json')
+ID_CACHE_TTL = 3600
 
-# Initialize the Google Sheets API
-sheets_api = build('sheets', 'v4', credentials=credentials)
+# Everything here only reads, and the batched metadata requests authorise with these credentials directly
+SCOPES = ['https://www.googleapis.com/auth/drive.readonly', 'https://www.googleapis.com/auth/spreadsheets.readonly']
 
-# Initialize gspread for retrieving worksheet content
-scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-gspread_credentials = gspread.service_account(filename=SERVICE_ACCOUNT_JSON)
+# API clients are built on first use so --help and argument errors don't load credentials.
+# static_discovery uses the discovery documents bundled with google-api-python-client instead
+# of fetching them over the network on every run.
+@functools.lru_cache(maxsize=None)
+def get_credentials():
+    credentials, _ = google.auth.default(scopes=SCOPES)
+    return credentials
+
+@functools.lru_cache(maxsize=None)
+def get_drive_api():
+    return build('drive', 'v3', credentials=get_credentials(), static_discovery=True, cache_discovery=False)
+
+@functools.lru_cache(maxsize=None)
+def get_sheets_api():
+    return build('sheets', 'v4', credentials=get_credentials(), static_discovery=True, cache_discovery=False)
+
+@functools.lru_cache(maxsize=None)
+def get_gspread_client():
+    # gspread is only needed for retrieving worksheet content
+    return gspread.service_account(filename=SERVICE_ACCOUNT_JSON)
+
+def positive_int(value):
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
 
 # Command-line argument parsing
 parser = argparse.ArgumentParser(description="Google Sheets Management Script")
@@ -27,50 +59,286 @@ parser.add_argument('--list-sheets', action='store_true', help="List sheets cont
 parser.add_argument('--spreadsheet-name', metavar="SPREADSHEET_NAME", help="Specify the name of the spreadsheet for --list-sheets and --get-content")
 parser.add_argument('--get-content', action='store_true', help="Retrieve the contents of a specified worksheet")
 parser.add_argument('--worksheet-name', metavar="WORKSHEET_NAME", help="Specify the name of the worksheet for --get-content")
+parser.add_argument('--export-all', action='store_true', help="Export every sheet of --spreadsheet-name, or of all spreadsheets if no name is given")
+parser.add_argument('--output-dir', default='sheets_export', help="Directory for --export-all output (default: sheets_export)")
+parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv', help="Output format for --export-all (default: csv)")
+parser.add_argument('--chunk-rows', type=positive_int, default=5000, help="Rows fetched per sheet per batchGet call for --export-all (default: 5000)")
+parser.add_argument('--with-sheets', action='store_true', help="With --list-worksheet-files, also list the sheets of every spreadsheet")
+parser.add_argument('--shared-drives', action='store_true', help="Search all shared drives the account can access, not just its own corpus")
+parser.add_argument('--workers', type=int, default=4, help="Concurrent batch requests for sheet metadata (default: 4)")
+parser.add_argument('--cache-ttl', type=int, default=ID_CACHE_TTL, help=f"Seconds to trust cached spreadsheet name -> ID lookups, 0 to disable (default: {ID_CACHE_TTL})")
 args = parser.parse_args()
 
-def list_worksheet_files():
+SPREADSHEET_MIME = "mimeType='application/vnd.google-apps.spreadsheet'"
+SHEET_METADATA_FIELDS = "spreadsheetId,sheets.properties(title,gridProperties(rowCount,columnCount))"
+# Google caps batch requests at 100 calls, but Sheets quota is per-minute so smaller batches retry cheaper
+METADATA_BATCH_SIZE = 50
+
+def iter_drive_files(query, fields="id,name", all_drives=False):
+    """Yield every file matching query, following nextPageToken until the listing is exhausted."""
+    params = {
+        'q': query,
+        'fields': f"nextPageToken,files({fields})",
+        'pageSize': 1000,
+        'supportsAllDrives': True,
+        'includeItemsFromAllDrives': True,
+    }
+    if all_drives:
+        params['corpora'] = 'allDrives'
+
+    page_token = None
+    while True:
+        response = get_drive_api().files().list(pageToken=page_token, **params).execute()
+        yield from response.get('files', [])
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            break
+
+def fetch_sheet_metadata(spreadsheet_ids, workers=4):
+    """Fetch sheet metadata for many spreadsheets using batched Sheets API calls run in parallel.
+
+    Returns a dict of spreadsheet ID -> metadata; failed lookups map to None.
+    """
+    results = {}
+    lock = threading.Lock()
+    credentials = get_credentials()
+    sheets_api = get_sheets_api()
+    spreadsheet_ids = list(spreadsheet_ids)
+    chunks = [spreadsheet_ids[i:i + METADATA_BATCH_SIZE] for i in range(0, len(spreadsheet_ids), METADATA_BATCH_SIZE)]
+
+    def callback(request_id, response, exception):
+        if exception is not None:
+            print(f"Failed to fetch sheets for {request_id}: {exception}")
+        with lock:
+            results[request_id] = response if exception is None else None
+
+    def run_batch(chunk):
+        # httplib2 is not thread-safe, so every batch gets its own authorized connection
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+        batch = sheets_api.new_batch_http_request(callback=callback)
+        for spreadsheet_id in chunk:
+            batch.add(sheets_api.spreadsheets().get(spreadsheetId=spreadsheet_id, fields=SHEET_METADATA_FIELDS),
+                      request_id=spreadsheet_id)
+        batch.execute(http=http)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for future in concurrent.futures.as_completed([executor.submit(run_batch, chunk) for chunk in chunks]):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Sheet metadata batch failed: {e}")
+    return results
+
+def list_worksheet_files(with_sheets=False, all_drives=False, workers=4):
     # List all spreadsheets accessible by the service account
-    spreadsheet_list = drive_api.files().list(q="mimeType='application/vnd.google-apps.spreadsheet'").execute()
+    spreadsheets = list(iter_drive_files(SPREADSHEET_MIME, all_drives=all_drives))
+    metadata = fetch_sheet_metadata([s['id'] for s in spreadsheets], workers) if with_sheets else {}
 
     # Print the names of all accessible spreadsheets
-    for spreadsheet in spreadsheet_list.get('files', []):
+    for spreadsheet in spreadsheets:
         print("Spreadsheet Name:", spreadsheet['name'])
+        for sheet in (metadata.get(spreadsheet['id']) or {}).get('sheets', []):
+            print("  Sheet Name:", sheet['properties']['title'])
+    print(f"Total spreadsheets: {len(spreadsheets)}")
 
-def list_sheets(spreadsheet_name):
-    # Search for the spreadsheet by name
-    spreadsheet_list = drive_api.files().list(q=f"name='{spreadsheet_name}' and mimeType='application/vnd.google-apps.spreadsheet'").execute()
-    spreadsheets = spreadsheet_list.get('files', [])
+def id_cache_key(spreadsheet_name):
+    # Different key files see different drives, so scope entries to the key in use
+    return f"{os.path.abspath(SERVICE_ACCOUNT_JSON)}:{spreadsheet_name}"
+
+def load_id_cache():
+    try:
+        with open(ID_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_id_cache(cache):
+    os.makedirs(os.path.dirname(ID_CACHE_FILE), exist_ok=True)
+    tmp_file = ID_CACHE_FILE + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_file, ID_CACHE_FILE)
+
+def forget_spreadsheet_id(spreadsheet_name):
+    cache = load_id_cache()
+    if cache.pop(id_cache_key(spreadsheet_name), None) is not None:
+        save_id_cache(cache)
 
+def resolve_spreadsheet_id(spreadsheet_name, all_drives=False, cache_ttl=ID_CACHE_TTL):
+    """Return the ID of the first spreadsheet with this name, or None, using the on-disk cache."""
+    key = id_cache_key(spreadsheet_name)
+    cache = load_id_cache() if cache_ttl > 0 else {}
+    entry = cache.get(key)
+    if entry and time.time() - entry['time'] < cache_ttl:
+        return entry['id']
+
+    spreadsheets = find_spreadsheets(spreadsheet_name, all_drives)
     if not spreadsheets:
+        return None
+
+    spreadsheet_id = spreadsheets[0]['id']
+    if cache_ttl > 0:
+        cache[key] = {'id': spreadsheet_id, 'time': time.time()}
+        save_id_cache(cache)
+    return spreadsheet_id
+
+def list_sheets(spreadsheet_name, all_drives=False, cache_ttl=ID_CACHE_TTL):
+    # Search for the spreadsheet by name
+    spreadsheet_id = resolve_spreadsheet_id(spreadsheet_name, all_drives, cache_ttl)
+
+    if not spreadsheet_id:
         print(f"No spreadsheet found with the name '{spreadsheet_name}'")
         return
 
-    spreadsheet = spreadsheets[0]
-    spreadsheet_id = spreadsheet['id']
-    spreadsheet_name = spreadsheet['name']
+    # Retrieve sheets within the current spreadsheet
+    try:
+        sheets_metadata = get_sheets_api().spreadsheets().get(spreadsheetId=spreadsheet_id, fields=SHEET_METADATA_FIELDS).execute()
+    except HttpError as e:
+        if e.resp.status != 404 or cache_ttl <= 0:
+            raise
+        # Stale cache entry (spreadsheet deleted or unshared); look the name up again
+        forget_spreadsheet_id(spreadsheet_name)
+        return list_sheets(spreadsheet_name, all_drives, 0)
 
     print("Spreadsheet Name:", spreadsheet_name)
 
-    # Retrieve sheets within the current spreadsheet
-    sheets_metadata = sheets_api.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
     for sheet in sheets_metadata['sheets']:
         sheet_title = sheet['properties']['title']
         print("  Sheet Name:", sheet_title)
 
-def get_content(spreadsheet_name, worksheet_name):
-    spreadsheet = gspread_credentials.open(spreadsheet_name)
+def get_content(spreadsheet_name, worksheet_name, all_drives=False, cache_ttl=ID_CACHE_TTL):
+    spreadsheet_id = resolve_spreadsheet_id(spreadsheet_name, all_drives, cache_ttl)
+    if not spreadsheet_id:
+        print(f"No spreadsheet found with the name '{spreadsheet_name}'")
+        return
+
+    try:
+        spreadsheet = get_gspread_client().open_by_key(spreadsheet_id)
+    except gspread.exceptions.SpreadsheetNotFound:
+        if cache_ttl <= 0:
+            raise
+        forget_spreadsheet_id(spreadsheet_name)
+        return get_content(spreadsheet_name, worksheet_name, all_drives, 0)
     worksheet = spreadsheet.worksheet(worksheet_name)
     content = worksheet.get_all_values()
     for row in content:
         print("\t".join(row))
 
+def safe_filename(name):
+    return re.sub(r'[^\w.\- ]', '_', name).strip() or '_'
+
+def unique_filenames(names, extension):
+    """Map each name to a sanitised filename, suffixing names that sanitise to the same file."""
+    filenames = {}
+    seen = set()
+    for name in names:
+        base = safe_filename(name)
+        filename = f"{base}.{extension}"
+        suffix = 2
+        # Compare case-insensitively so exports don't collide on macOS/Windows filesystems
+        while filename.lower() in seen:
+            filename = f"{base}_{suffix}.{extension}"
+            suffix += 1
+        seen.add(filename.lower())
+        filenames[name] = filename
+    return filenames
+
+def a1_sheet(title):
+    # Sheet titles are quoted in A1 notation, with embedded quotes doubled
+    return "'" + title.replace("'", "''") + "'"
+
+class SheetWriter:
+    """Streams one sheet's rows to disk as they arrive, keeping row numbers aligned across chunks."""
+
+    def __init__(self, path, output_format):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.output_format = output_format
+        self.csv_writer = csv.writer(self.file) if output_format == 'csv' else None
+        self.next_row = 1
+
+    def write_chunk(self, start_row, rows):
+        if not rows:
+            return
+        # The API omits trailing empty rows of a range, so pad the gap left by the previous chunk
+        if self.csv_writer:
+            for _ in range(start_row - self.next_row):
+                self.csv_writer.writerow([])
+            self.csv_writer.writerows(rows)
+        else:
+            for offset, row in enumerate(rows):
+                self.file.write(json.dumps({"row": start_row + offset, "values": row}) + "\n")
+        self.next_row = start_row + len(rows)
+
+    def close(self):
+        self.file.close()
+
+def find_spreadsheets(spreadsheet_name=None, all_drives=False):
+    query = SPREADSHEET_MIME
+    if spreadsheet_name:
+        escaped_name = spreadsheet_name.replace("'", "\\'")
+        query = f"name='{escaped_name}' and " + query
+    return list(iter_drive_files(query, all_drives=all_drives))
+
+def export_spreadsheet(spreadsheet_id, spreadsheet_name, output_dir, output_format, chunk_rows, metadata=None):
+    if metadata is None:
+        metadata = get_sheets_api().spreadsheets().get(spreadsheetId=spreadsheet_id, fields=SHEET_METADATA_FIELDS).execute()
+    sheets = [(sheet['properties']['title'], sheet['properties'].get('gridProperties', {}).get('rowCount', 0))
+              for sheet in metadata.get('sheets', [])]
+
+    # Spreadsheet names aren't unique in Drive, so the ID keeps same-named spreadsheets apart
+    target_dir = os.path.join(output_dir, f"{safe_filename(spreadsheet_name)}_{spreadsheet_id}")
+    os.makedirs(target_dir, exist_ok=True)
+    filenames = unique_filenames([title for title, _ in sheets], output_format)
+    writers = {title: SheetWriter(os.path.join(target_dir, filenames[title]), output_format)
+               for title, _ in sheets}
+
+    # Each round asks for the next chunk of every sheet that still has rows in a single batchGet,
+    # so small spreadsheets cost one request and memory is bounded by chunk_rows per sheet.
+    try:
+        start_row = 1
+        while True:
+            pending = [title for title, row_count in sheets if row_count >= start_row]
+            if not pending:
+                break
+            end_row = start_row + chunk_rows - 1
+            response = get_sheets_api().spreadsheets().values().batchGet(
+                spreadsheetId=spreadsheet_id,
+                ranges=[f"{a1_sheet(title)}!{start_row}:{end_row}" for title in pending],
+                majorDimension='ROWS',
+                valueRenderOption='FORMATTED_VALUE'
+            ).execute()
+            for title, value_range in zip(pending, response.get('valueRanges', [])):
+                writers[title].write_chunk(start_row, value_range.get('values', []))
+            start_row = end_row + 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    print(f"Exported {len(sheets)} sheet(s) from '{spreadsheet_name}' to {target_dir}")
+
+def export_all(spreadsheet_name, output_dir, output_format, chunk_rows, all_drives=False, workers=4):
+    spreadsheets = find_spreadsheets(spreadsheet_name, all_drives)
+    if not spreadsheets:
+        print(f"No spreadsheet found with the name '{spreadsheet_name}'" if spreadsheet_name else "No spreadsheets found")
+        return
+
+    # Prefetch every sheet layout up front so the export loop only issues batchGet calls
+    metadata = fetch_sheet_metadata([s['id'] for s in spreadsheets], workers)
+    for spreadsheet in spreadsheets:
+        try:
+            export_spreadsheet(spreadsheet['id'], spreadsheet['name'], output_dir, output_format, chunk_rows,
+                               metadata.get(spreadsheet['id']))
+        except Exception as e:
+            print(f"Failed to export '{spreadsheet['name']}': {e}")
+
 if __name__ == '__main__':
     if args.list_worksheet_files:
-        list_worksheet_files()
+        list_worksheet_files(args.with_sheets, args.shared_drives, args.workers)
     elif args.list_sheets and args.spreadsheet_name:
-        list_sheets(args.spreadsheet_name)
+        list_sheets(args.spreadsheet_name, args.shared_drives, args.cache_ttl)
     elif args.get_content and args.spreadsheet_name and args.worksheet_name:
-        get_content(args.spreadsheet_name, args.worksheet_name)
+        get_content(args.spreadsheet_name, args.worksheet_name, args.shared_drives, args.cache_ttl)
+    elif args.export_all:
+        export_all(args.spreadsheet_name, args.output_dir, args.format, args.chunk_rows, args.shared_drives, args.workers)
     else:
         parser.print_help()
@@ -0,0 +1,184 @@
+import os
+import sys
+import time
+import base64
+import random
+import argparse
+import tempfile
+import multiprocessing
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import extractLinkedInUsernamedfromBurp as extractor
+
+
+'''
+Synthetic Burp XML export generator and benchmark for extractLinkedInUsernamedfromBurp.py.
+
+Usage:
+
+python3 bench_burp_extractor.py generate --output burp_fixture.xml --items 20000 --response-size 32768 --match-fraction 0.3
+python3 bench_burp_extractor.py bench --file burp_fixture.xml --jobs 4
+python3 bench_burp_extractor.py bench --items 5000 --response-size 65536 --no-base64
+
+bench without --file generates a temporary fixture with the same options as generate. Every
+engine runs in its own process so peak RSS is reported per engine.
+'''
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Chris", "Karen"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin"]
+FILLER = '{"$type":"com.linkedin.voyager.dash.search.EntityResultViewModel","trackingId":"%08x","badges":[]},'
+
+def response_body(rng, size, matching, names_per_response):
+    """Build an HTTP response whose JSON body is roughly `size` bytes."""
+    parts = ['HTTP/2 200 OK\r\ncontent-type: application/json\r\n\r\n{"included":[']
+    length = len(parts[0])
+    if matching:
+        for _ in range(names_per_response):
+            person = (f'{{"title":{{"text":"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}","attributesV2":[]}},'
+                      f'"primarySubtitle":{{"text":"Engineer at Example"}},'
+                      f'"entityUrn":"urn:li:fsd_profile:ACoAA{rng.getrandbits(40):010X}"}},')
+            parts.append(person)
+            length += len(person)
+    while length < size:
+        filler = FILLER % rng.getrandbits(32)
+        parts.append(filler)
+        length += len(filler)
+    parts.append('{}]}')
+    return ''.join(parts)
+
+def generate_export(path, items, response_size, use_base64, match_fraction, names_per_response, seed=0):
+    """Stream a Burp-style XML export to disk item by item, so huge fixtures use flat memory."""
+    rng = random.Random(seed)
+    request = base64.b64encode(b"GET /voyager/api/graphql HTTP/2\r\nHost: www.linkedin.com\r\n\r\n").decode()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0"?>\n<items burpVersion="2024.1" exportTime="Mon Jan 01 00:00:00 UTC 2024">\n')
+        for i in range(items):
+            body = response_body(rng, response_size, rng.random() < match_fraction, names_per_response)
+            if use_base64:
+                response = f'<response base64="true"><![CDATA[{base64.b64encode(body.encode()).decode()}]]></response>'
+            else:
+                response = f'<response base64="false"><![CDATA[{body}]]></response>'
+            f.write(
+                "  <item>\n"
+                f"    <time>Mon Jan 01 00:00:{i % 60:02d} UTC 2024</time>\n"
+                f"    <url><![CDATA[https://www.linkedin.com/voyager/api/graphql?start={i * 10}]]></url>\n"
+                '    <host ip="13.107.42.14">www.linkedin.com</host>\n'
+                "    <port>443</port>\n    <protocol>https</protocol>\n    <method><![CDATA[GET]]></method>\n"
+                f'    <request base64="true"><![CDATA[{request}]]></request>\n'
+                f"    <status>200</status>\n    <responselength>{len(body)}</responselength>\n"
+                "    <mimetype>JSON</mimetype>\n"
+                f"    {response}\n"
+                "    <comment></comment>\n"
+                "  </item>\n"
+            )
+        f.write("</items>\n")
+
+def peak_rss_mb():
+    if resource is None:
+        return float("nan")
+    # Include reaped children so process-pool workers count towards the parallel engine
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_engine(engine, filename, jobs, connection):
+    start = time.perf_counter()
+    if engine == "dom":
+        names = extractor.process_burp_file(filename)
+    else:
+        names = extractor.iter_burp_names(filename, jobs)
+    count = sum(1 for _ in names)
+    elapsed = time.perf_counter() - start
+    connection.send({"names": count, "seconds": elapsed, "peak_rss_mb": peak_rss_mb()})
+    connection.close()
+
+def measure(engine, filename, jobs):
+    # Fresh process per engine: ru_maxrss never goes down, so sharing one would hide differences
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=run_engine, args=(engine, filename, jobs, sender))
+    process.start()
+    result = receiver.recv()
+    process.join()
+    return result
+
+def run_benchmark(args):
+    filename = args.file
+    temporary = None
+    if filename is None:
+        temporary = tempfile.NamedTemporaryFile(suffix=".xml", delete=False)
+        temporary.close()
+        filename = temporary.name
+        print(f"Generating fixture: {args.items} items, ~{args.response_size} byte responses, "
+              f"base64={'on' if args.base64 else 'off'}, match fraction={args.match_fraction}")
+        generate_export(filename, args.items, args.response_size, args.base64, args.match_fraction,
+                        args.names_per_response, args.seed)
+
+    try:
+        size_mb = os.path.getsize(filename) / (1024 * 1024)
+        items = sum(1 for _ in extractor.iter_response_payloads(filename))
+        print(f"Export: {filename} ({size_mb:.1f} MB, {items} items with responses)")
+
+        engines = [("dom", 1), ("stream", 1)]
+        if args.jobs > 1:
+            engines.append(("stream", args.jobs))
+        if args.skip_dom:
+            engines = engines[1:]
+
+        results = []
+        for engine, jobs in engines:
+            result = measure(engine, filename, jobs)
+            results.append(result)
+            seconds = result["seconds"] or 1e-9
+            label = engine if engine == "dom" else f"stream -j{jobs}"
+            print(f"{label:>12}: {result['names']:>8} names in {result['seconds']:.2f}s  "
+                  f"{items / seconds:>9.1f} items/sec  {size_mb / seconds:>7.1f} MB/sec  "
+                  f"peak RSS {result['peak_rss_mb']:.1f} MB")
+
+        if len({r["names"] for r in results}) > 1:
+            note = " (the dom engine skips responses stored without base64)" if not args.base64 else ""
+            print(f"WARNING: engines disagree on the number of names{note}", file=sys.stderr)
+    finally:
+        if temporary is not None:
+            os.remove(filename)
+
+def add_fixture_args(parser):
+    parser.add_argument("--items", type=int, default=2000, help="Number of <item> elements")
+    parser.add_argument("--response-size", type=int, default=16384, help="Approximate response size in bytes")
+    parser.add_argument("--base64", action=argparse.BooleanOptionalAction, default=True,
+                        help="Store responses base64-encoded like Burp's default export (default: on)")
+    parser.add_argument("--match-fraction", type=float, default=0.25, help="Fraction of responses that contain names")
+    parser.add_argument("--names-per-response", type=int, default=10, help="Names in each matching response")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+def main():
+    parser = argparse.ArgumentParser(description="Burp export fixture generator and extractor benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="Write a synthetic Burp XML export")
+    generate.add_argument("--output", required=True, help="Path of the XML file to write")
+    add_fixture_args(generate)
+
+    bench = subparsers.add_parser("bench", help="Benchmark the dom and streaming engines")
+    bench.add_argument("--file", help="Existing Burp export to benchmark (default: generate a temporary one)")
+    bench.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes for the parallel run")
+    bench.add_argument("--skip-dom", action="store_true", help="Skip the dom engine (it loads the whole export)")
+    add_fixture_args(bench)
+
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        generate_export(args.output, args.items, args.response_size, args.base64, args.match_fraction,
+                        args.names_per_response, args.seed)
+        print(f"Wrote {args.items} items to {args.output} ({os.path.getsize(args.output) / (1024 * 1024):.1f} MB)")
+    else:
+        run_benchmark(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import os
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+import createSlides
+
+
+'''
+Synthetic deck generator and offline benchmark for createSlides.py. Times the markdown parser, the
+Reveal.js build (full and after a one-slide edit) and Google Slides sync planning (new deck and
+after a one-slide edit). Nothing touches the network or npm.
+
+Usage:
+
+python3 bench_createSlides.py generate --output deck.md --slides 3000
+python3 bench_createSlides.py bench --slides 5000 --repeat 5
+python3 bench_createSlides.py bench --file training.md
+'''
+
+WORDS = ["payload", "token", "scope", "lateral", "movement", "credential", "domain", "kerberos", "ticket",
+         "relay", "phishing", "beacon", "implant", "persistence", "privilege", "escalation", "recon", "pivot"]
+
+
+def sentence(rng, words=8):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def generate_slide(rng, index):
+    parts = [f"# {index}. {sentence(rng, 4)}", ""]
+    kind = rng.random()
+    if kind < 0.4:
+        for _ in range(rng.randint(3, 6)):
+            parts.append(f"- {sentence(rng)}")
+            if rng.random() < 0.3:
+                parts.append(f"  - {sentence(rng, 5)}")
+    elif kind < 0.6:
+        for n in range(1, rng.randint(3, 6)):
+            parts.append(f"{n}. {sentence(rng)}")
+    elif kind < 0.8:
+        # Code containing a YAML document marker, which the old '---' split cut in half
+        parts += [sentence(rng), "", "```yaml", "---", f"name: {rng.choice(WORDS)}", "steps:",
+                  f"  - run: {rng.choice(WORDS)}", "```"]
+    else:
+        parts += ["| Technique | Detection |", "|---|---|"]
+        for _ in range(rng.randint(2, 5)):
+            parts.append(f"| {rng.choice(WORDS)} | {sentence(rng, 3)} |")
+    return "\n".join(parts)
+
+
+def generate_deck(slides, seed=0):
+    rng = random.Random(seed)
+    return "\n\n---\n\n".join(generate_slide(rng, i) for i in range(slides)) + "\n"
+
+
+def best_of(repeat, func):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def report(label, seconds, slides, extra=""):
+    print(f"{label:>24}: {seconds * 1000:>9.1f} ms  {slides / (seconds or 1e-9):>10.0f} slides/sec{extra}")
+
+
+def run_benchmark(args):
+    workdir = tempfile.mkdtemp(prefix="slides_bench_")
+    try:
+        # Work on a copy; the edit measurements rewrite the deck
+        deck_file = os.path.join(workdir, "deck.md")
+        if args.file:
+            shutil.copy(args.file, deck_file)
+        else:
+            with open(deck_file, "w", encoding="utf-8") as f:
+                f.write(generate_deck(args.slides, args.seed))
+        with open(deck_file, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        parse_time, slides = best_of(args.repeat, lambda: createSlides.parse_slides(content))
+        naive = sum(1 for part in content.split("---") if part.strip())
+        print(f"Deck: {args.file or 'generated'} ({len(content) / (1024 * 1024):.2f} MB, {len(slides)} slides; "
+              f"a plain split on '---' finds {naive} sections)")
+        report("parse", parse_time, len(slides))
+
+        # Reveal.js: full render, then an incremental rebuild after editing one slide
+        output_dir = os.path.join(workdir, "out")
+        converter = createSlides.SlideConverter(deck_file, output_dir)
+        converter.setup_reveal_js = lambda: None
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            full_time, _ = best_of(args.repeat, lambda: converter.markdown_to_reveal(force=True))
+            first_line = slides[len(slides) // 2].markdown.split("\n")[0]
+            edited = content.replace(first_line, first_line + " (edited)", 1)
+            with open(deck_file, "w", encoding="utf-8") as f:
+                f.write(edited)
+            incremental_time, _ = best_of(1, converter.markdown_to_reveal)
+            noop_time, _ = best_of(args.repeat, converter.markdown_to_reveal)
+        html_mb = os.path.getsize(converter.html_output) / (1024 * 1024)
+        report("reveal full build", full_time, len(slides), f"  ({html_mb:.1f} MB HTML)")
+        report("reveal one-slide edit", incremental_time, len(slides))
+        report("reveal unchanged", noop_time, len(slides))
+
+        # Google Slides: plan a brand new deck, then a sync after the same one-slide edit
+        new_time, (groups, slide_map, _) = best_of(args.repeat, lambda: converter.plan_sync(slides, [], []))
+        requests = sum(len(group["requests"]) for group in groups)
+        chunks = sum(1 for _ in converter.chunk_requests(groups))
+        report("gslides plan new deck", new_time, len(slides), f"  ({requests} requests, {chunks} batchUpdate calls)")
+
+        edited_slides = createSlides.parse_slides(edited)
+        current_ids = [entry["object_id"] for entry in slide_map]
+        sync_time, (groups, _, counts) = best_of(
+            args.repeat, lambda: converter.plan_sync(edited_slides, slide_map, current_ids))
+        requests = sum(len(group["requests"]) for group in groups)
+        report("gslides plan one edit", sync_time, len(slides),
+               f"  ({requests} requests: {counts['updated']} updated, {counts['created']} created)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic deck generator and createSlides.py benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="Write a synthetic markdown deck")
+    generate.add_argument("--output", required=True, help="Path of the markdown file to write")
+    generate.add_argument("--slides", type=int, default=3000, help="Number of slides")
+    generate.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    bench = subparsers.add_parser("bench", help="Time parsing and both backends offline")
+    bench.add_argument("--file", help="Existing markdown deck (default: generate one)")
+    bench.add_argument("--slides", type=int, default=3000, help="Slides in the generated deck")
+    bench.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported")
+    bench.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(generate_deck(args.slides, args.seed))
+        print(f"Wrote {args.slides} slides to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+    else:
+        run_benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
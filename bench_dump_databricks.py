@@ -0,0 +1,268 @@
+import os
+import io
+import sys
+import json
+import time
+import base64
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import tracemalloc
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+'''
+Local stand-in for the Databricks workspace API plus a throughput benchmark for dump_databricks.py.
+Serves workspace/list, workspace/export and the auth check from a synthetic tree, so crawl and
+export changes can be measured offline.
+
+Usage:
+
+python3 bench_dump_databricks.py serve --port 8900 --depth 3 --fanout 4 --notebooks 10 --latency-ms 20 --rate-limit 0.05
+python3 dump_databricks.py --token fake-token --base-url http://127.0.0.1:8900 --action download
+
+python3 bench_dump_databricks.py bench --depth 3 --fanout 4 --notebooks 10 --object-size 65536 --latency-ms 5
+python3 bench_dump_databricks.py bench --scan --jobs 4
+'''
+
+FAKE_TOKEN = "fake-token"
+NOTEBOOK_TEMPLATE = "# Databricks notebook source\nprint('{path}')\n"
+
+
+class FakeWorkspace:
+    """Synthetic workspace tree: `fanout` folders per level, `notebooks` notebooks per folder."""
+
+    def __init__(self, depth, fanout, notebooks, object_size, latency_ms, rate_limit, seed=0):
+        self.depth = depth
+        self.fanout = fanout
+        self.notebooks = notebooks
+        self.object_size = object_size
+        self.latency = latency_ms / 1000.0
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"list": 0, "export": 0, "throttled": 0}
+        # Filler is generated once and sliced per export so the server isn't the bottleneck
+        self.filler = (b"x = 1  # filler\n" * (object_size // 16 + 1))[:object_size]
+
+    def children(self, path):
+        level = 0 if path == "/" else path.strip("/").count("/") + 1
+        prefix = "" if path == "/" else path
+        objects = []
+        if level < self.depth:
+            for i in range(self.fanout):
+                objects.append({"path": f"{prefix}/folder{i}", "object_type": "DIRECTORY"})
+        for i in range(self.notebooks):
+            objects.append({"path": f"{prefix}/notebook{i}", "object_type": "NOTEBOOK", "language": "PYTHON"})
+        return objects
+
+    def total_notebooks(self):
+        folders = sum(self.fanout ** level for level in range(self.depth + 1))
+        return folders * self.notebooks
+
+    def export(self, path):
+        header = NOTEBOOK_TEMPLATE.format(path=path).encode()
+        return header + self.filler[len(header):]
+
+    def should_throttle(self):
+        with self.lock:
+            throttle = self.random.random() < self.rate_limit
+            if throttle:
+                self.stats["throttled"] += 1
+            return throttle
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+
+def make_handler(workspace, token):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without this, delayed ACKs add ~40ms per request
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, status, body, content_type="application/json", headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_json(self, status, payload, headers=None):
+            self.send_body(status, json.dumps(payload).encode(), headers=headers)
+
+        def do_GET(self):
+            if workspace.latency:
+                time.sleep(workspace.latency)
+
+            if self.headers.get("Authorization") != f"Bearer {token}":
+                self.send_json(401, {"error_code": "UNAUTHENTICATED", "message": "Invalid access token."})
+                return
+
+            if workspace.should_throttle():
+                self.send_json(429, {"error_code": "REQUEST_LIMIT_EXCEEDED", "message": "Too many requests."},
+                               headers={"Retry-After": "0"})
+                return
+
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            endpoint = url.path.rstrip("/")
+
+            if endpoint == "/api/2.0":
+                self.send_json(200, {})
+            elif endpoint == "/api/2.0/workspace/list":
+                workspace.count("list")
+                self.send_json(200, {"objects": workspace.children(params.get("path", "/"))})
+            elif endpoint == "/api/2.0/workspace/export":
+                workspace.count("export")
+                content = workspace.export(params.get("path", "/"))
+                if params.get("direct_download") == "true":
+                    self.send_body(200, content, content_type="application/octet-stream")
+                else:
+                    self.send_json(200, {"content": base64.b64encode(content).decode(), "file_type": "dbc"})
+            else:
+                self.send_json(404, {"error_code": "ENDPOINT_NOT_FOUND", "message": self.path})
+
+    return Handler
+
+
+def start_server(workspace, host, port, token=FAKE_TOKEN):
+    server = ThreadingHTTPServer((host, port), make_handler(workspace, token))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def peak_rss_mb():
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(label, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"phase": label, "seconds": elapsed, "peak_heap_mb": peak / (1024 * 1024), **result}
+
+
+def run_benchmark(args):
+    import dump_databricks
+
+    workspace = FakeWorkspace(args.depth, args.fanout, args.notebooks, args.object_size,
+                              args.latency_ms, args.rate_limit, args.seed)
+    server = start_server(workspace, "127.0.0.1", 0)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/api/2.0/"
+    headers = {"Authorization": f"Bearer {FAKE_TOKEN}"}
+    output_dir = tempfile.mkdtemp(prefix="dbx_bench_")
+
+    def list_phase():
+        objects = sum(1 for _ in dump_databricks.iter_workspace_objects(headers, base_url))
+        return {"objects": objects, "bytes": 0}
+
+    def download_phase():
+        # export_notebooks prints one line per notebook; keep that out of the timing output
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            if args.scan:
+                findings = os.path.join(output_dir, "findings.ndjson")
+                with contextlib.redirect_stderr(io.StringIO()):
+                    with dump_databricks.SecretScanStage(findings, args.jobs) as scanner:
+                        dump_databricks.export_notebooks(headers, base_url, scanner, output_dir)
+            else:
+                dump_databricks.export_notebooks(headers, base_url, output_dir=output_dir)
+        written = 0
+        files = 0
+        for dirpath, _, filenames in os.walk(output_dir):
+            for filename in filenames:
+                if filename.endswith(".dbc"):
+                    files += 1
+                    written += os.path.getsize(os.path.join(dirpath, filename))
+        return {"objects": files, "bytes": written}
+
+    try:
+        results = [measure("list", list_phase), measure("download", download_phase)]
+    finally:
+        server.shutdown()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    expected = workspace.total_notebooks()
+    print(f"Workspace: depth={args.depth} fanout={args.fanout} notebooks/folder={args.notebooks} "
+          f"({expected} notebooks, {args.object_size} bytes each), latency={args.latency_ms}ms, "
+          f"429 rate={args.rate_limit}")
+    for r in results:
+        seconds = r["seconds"] or 1e-9
+        print(f"{r['phase']:>8}: {r['objects']:>7} objects in {r['seconds']:.2f}s  "
+              f"{r['objects'] / seconds:>9.1f} objects/sec  "
+              f"{r['bytes'] / seconds / (1024 * 1024):>8.2f} MB/sec  "
+              f"peak heap {r['peak_heap_mb']:.1f} MB")
+    print(f"Server requests: {workspace.stats['list']} list, {workspace.stats['export']} export, "
+          f"{workspace.stats['throttled']} throttled (429)")
+    print(f"Peak RSS: {peak_rss_mb():.1f} MB")
+    if results[1]["objects"] != expected:
+        print(f"WARNING: downloaded {results[1]['objects']} of {expected} notebooks", file=sys.stderr)
+
+
+def add_workspace_args(parser):
+    parser.add_argument("--depth", type=int, default=2, help="Folder nesting depth")
+    parser.add_argument("--fanout", type=int, default=4, help="Sub-folders per folder")
+    parser.add_argument("--notebooks", type=int, default=10, help="Notebooks per folder")
+    parser.add_argument("--object-size", type=int, default=16384, help="Exported notebook size in bytes")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added latency per request")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Fraction of requests answered with 429")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for 429 injection")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Databricks workspace API and dump_databricks.py benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Run the fake workspace API")
+    add_workspace_args(serve)
+    serve.add_argument("--host", default="127.0.0.1", help="Listen address")
+    serve.add_argument("--port", type=int, default=8900, help="Listen port")
+    serve.add_argument("--token", default=FAKE_TOKEN, help="Accepted bearer token")
+
+    bench = subparsers.add_parser("bench", help="Benchmark list and download against an in-process fake API")
+    add_workspace_args(bench)
+    bench.add_argument("--scan", action="store_true", help="Enable the inline secret scanner during download")
+    bench.add_argument("--jobs", type=int, default=None, help="Scanner worker processes")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        workspace = FakeWorkspace(args.depth, args.fanout, args.notebooks, args.object_size,
+                                  args.latency_ms, args.rate_limit, args.seed)
+        server = start_server(workspace, args.host, args.port, args.token)
+        print(f"Fake Databricks API on http://{args.host}:{args.port} ({workspace.total_notebooks()} notebooks), "
+              f"token '{args.token}'. Ctrl+C to stop.")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        run_benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
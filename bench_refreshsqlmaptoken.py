@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import time
+import uuid
+import base64
+import random
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+'''
+Offline harness for the refreshsqlmaptoken.py tamper: a stub OAuth refresh-token endpoint and a
+load test that calls tamper() from many threads, the way sqlmap --threads does.
+
+The load test imports the tamper, so it needs sqlmap's lib/ package on the path (--sqlmap-dir,
+$SQLMAP_DIR, or one of the usual install locations).
+
+Usage:
+
+python3 bench_refreshsqlmaptoken.py serve --port 8901 --lifetime 60 --rotate
+python3 bench_refreshsqlmaptoken.py load --threads 10 --payloads 2000 --lifetime 5 --latency-ms 50 --reject-rate 0.01
+'''
+
+SQLMAP_DIRS = ["/usr/share/sqlmap", "/usr/local/share/sqlmap", "/opt/sqlmap", "/usr/local/Cellar/sqlmap"]
+INITIAL_REFRESH_TOKEN = "initial-refresh-token"
+
+
+class StubOAuth:
+    """Issues access tokens for refresh_token grants, optionally rotating refresh tokens."""
+
+    def __init__(self, lifetime, latency_ms, rotate, jwt, fail_rate, seed=0):
+        self.lifetime = lifetime
+        self.latency = latency_ms / 1000.0
+        self.rotate = rotate
+        self.jwt = jwt
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.valid_refresh_tokens = {INITIAL_REFRESH_TOKEN}
+        self.stats = {"requests": 0, "issued": 0, "failed": 0, "invalid_grant": 0}
+
+    def make_access_token(self):
+        if not self.jwt:
+            return uuid.uuid4().hex
+
+        def segment(obj):
+            return base64.urlsafe_b64encode(json.dumps(obj).encode()).decode().rstrip("=")
+        claims = {"sub": "bench", "jti": uuid.uuid4().hex, "exp": int(time.time() + self.lifetime)}
+        return f"{segment({'alg': 'none', 'typ': 'JWT'})}.{segment(claims)}.sig"
+
+    def grant(self, refresh_token):
+        """Return (status, body) for a refresh_token grant."""
+        with self.lock:
+            self.stats["requests"] += 1
+            if self.random.random() < self.fail_rate:
+                self.stats["failed"] += 1
+                return 503, {"error": "temporarily_unavailable"}
+            if refresh_token not in self.valid_refresh_tokens:
+                self.stats["invalid_grant"] += 1
+                return 400, {"error": "invalid_grant"}
+            body = {"access_token": self.make_access_token(), "token_type": "Bearer"}
+            if not self.jwt:
+                # JWT mode leaves out expires_in so the tamper has to read the exp claim
+                body["expires_in"] = self.lifetime
+            if self.rotate:
+                new_refresh_token = uuid.uuid4().hex
+                self.valid_refresh_tokens = {new_refresh_token}
+                body["refresh_token"] = new_refresh_token
+            self.stats["issued"] += 1
+            return 200, body
+
+
+def make_handler(oauth):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            if oauth.latency:
+                time.sleep(oauth.latency)
+            raw = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                form = json.loads(raw or "{}")
+            else:
+                form = {k: v[0] for k, v in parse_qs(raw).items()}
+
+            if form.get("grant_type") != "refresh_token":
+                status, body = 400, {"error": "unsupported_grant_type"}
+            else:
+                status, body = oauth.grant(form.get("refresh_token"))
+
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def start_server(oauth, host, port):
+    server = ThreadingHTTPServer((host, port), make_handler(oauth))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def import_tamper(sqlmap_dir, config_path):
+    candidates = [sqlmap_dir] if sqlmap_dir else [os.environ.get("SQLMAP_DIR")] + SQLMAP_DIRS
+    for candidate in filter(None, candidates):
+        if os.path.isdir(os.path.join(candidate, "lib", "core")):
+            sys.path.insert(0, candidate)
+            break
+    else:
+        sys.exit("sqlmap not found; pass --sqlmap-dir pointing at a sqlmap checkout")
+
+    # The tamper reads its config at import time
+    os.environ["SQLMAP_TOKEN_CONFIG"] = config_path
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import refreshsqlmaptoken
+    from lib.core.threads import getCurrentThreadData
+    return refreshsqlmaptoken, getCurrentThreadData
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run_load(args):
+    oauth = StubOAuth(args.lifetime, args.latency_ms, args.rotate, args.jwt, args.fail_rate, args.seed)
+    server = start_server(oauth, "127.0.0.1", 0)
+    config = {
+        "url": f"http://127.0.0.1:{server.server_address[1]}/oauth/token",
+        "headers": {"Cookie": "session=bench"},
+        "body_type": args.body_type,
+        "refresh_token": INITIAL_REFRESH_TOKEN,
+        "backoff_base": 0.05,
+    }
+    if args.refresh_margin is not None:
+        config["refresh_margin"] = args.refresh_margin
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(config, f)
+        config_path = f.name
+
+    try:
+        tamper_module, getCurrentThreadData = import_tamper(args.sqlmap_dir, config_path)
+        latencies = []
+        missing = []
+        lock = threading.Lock()
+        per_thread = args.payloads // args.threads
+
+        def worker(index):
+            rng = random.Random(args.seed + index)
+            thread_data = getCurrentThreadData()
+            local_latencies = []
+            local_missing = 0
+            for i in range(per_thread):
+                # Pretend the target answered the previous request with 401 now and then
+                if rng.random() < args.reject_rate:
+                    thread_data.lastHTTPError = (f"{index}-{i}", 401, 1)
+                headers = {}
+                start = time.perf_counter()
+                tamper_module.tamper("1 AND 1=1", headers=headers)
+                local_latencies.append(time.perf_counter() - start)
+                if config.get("header_name", "Authorization") not in headers:
+                    local_missing += 1
+            with lock:
+                latencies.extend(local_latencies)
+                missing.append(local_missing)
+
+        # The tamper prints on every refresh; keep that out of the report
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        start = time.perf_counter()
+        try:
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        os.remove(config_path)
+
+    payloads = len(latencies)
+    latencies.sort()
+    print(f"{payloads} payloads from {args.threads} threads in {elapsed:.2f}s ({payloads / elapsed:.0f} payloads/sec)")
+    print(f"Token endpoint: {oauth.stats['requests']} requests, {oauth.stats['issued']} issued, "
+          f"{oauth.stats['failed']} injected failures, {oauth.stats['invalid_grant']} invalid_grant")
+    print(f"Refresh calls per payload: {oauth.stats['requests'] / max(payloads, 1):.4f} "
+          f"(the old tamper made 1.0), token lifetime {args.lifetime:g}s, "
+          f"refresh margin {tamper_module.tokens.config['refresh_margin']:g}s")
+    print(f"Added latency per payload: mean {sum(latencies) / max(payloads, 1) * 1000:.3f} ms, "
+          f"p50 {percentile(latencies, 0.50) * 1000:.3f} ms, p99 {percentile(latencies, 0.99) * 1000:.3f} ms, "
+          f"max {latencies[-1] * 1000 if latencies else 0:.3f} ms")
+    if sum(missing):
+        print(f"WARNING: {sum(missing)} payloads were sent without a token", file=sys.stderr)
+
+
+def add_server_args(parser):
+    parser.add_argument("--lifetime", type=float, default=60, help="Access token lifetime in seconds")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Token endpoint latency")
+    parser.add_argument("--rotate", action=argparse.BooleanOptionalAction, default=True,
+                        help="Issue a new refresh token on every grant and reject the old one (default: on)")
+    parser.add_argument("--jwt", action="store_true", help="Issue JWT access tokens with exp instead of expires_in")
+    parser.add_argument("--fail-rate", type=float, default=0, help="Fraction of grants answered with 503")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub OAuth server and load test for the refreshsqlmaptoken tamper")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Run the stub token endpoint")
+    add_server_args(serve)
+    serve.add_argument("--host", default="127.0.0.1", help="Listen address")
+    serve.add_argument("--port", type=int, default=8901, help="Listen port")
+
+    load = subparsers.add_parser("load", help="Drive tamper() from many threads against an in-process stub")
+    add_server_args(load)
+    load.add_argument("--threads", type=int, default=10, help="Concurrent tamper threads (sqlmap --threads)")
+    load.add_argument("--payloads", type=int, default=2000, help="Total payloads to tamper")
+    load.add_argument("--reject-rate", type=float, default=0, help="Fraction of payloads preceded by a simulated 401")
+    load.add_argument("--refresh-margin", type=float, help="Tamper refresh_margin in seconds (default: the tamper's own)")
+    load.add_argument("--body-type", choices=["form", "json"], default="form", help="Token request encoding")
+    load.add_argument("--sqlmap-dir", help="sqlmap checkout containing lib/ (default: $SQLMAP_DIR or common paths)")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        oauth = StubOAuth(args.lifetime, args.latency_ms, args.rotate, args.jwt, args.fail_rate, args.seed)
+        server = start_server(oauth, args.host, args.port)
+        print(f"Stub token endpoint on http://{args.host}:{args.port}/oauth/token, "
+              f"initial refresh token '{INITIAL_REFRESH_TOKEN}'. Ctrl+C to stop.")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        run_load(args)
+
+
+if __name__ == "__main__":
+    main()
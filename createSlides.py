@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+import re
 import markdown
 import argparse
 from google.oauth2.credentials import Credentials
@@ -11,7 +12,113 @@ import pickle
 import json
 import sys
 import uuid
+import time
+import random
 import shutil
+import hashlib
+from google.auth.exceptions import RefreshError
+
+# batchUpdate limits per call; Slides rejects very large request bodies
+MAX_BATCH_REQUESTS = 500
+MAX_BATCH_BYTES = 1024 * 1024
+# Rate limits and transient server errors are retried with truncated exponential backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 6
+MAX_BACKOFF = 64
+
+FENCE_RE = re.compile(r'^\s*(`{3,}|~{3,})')
+BULLET_RE = re.compile(r'^(\s*)[-*+]\s+(.*)$')
+NUMBER_RE = re.compile(r'^(\s*)\d+[.)]\s+(.*)$')
+
+class Slide:
+    """One slide of the deck as parsed by parse_slides.
+
+    `lines` is the slide's markdown as Reveal.js gets it: lines stripped, except list items,
+    which keep their indentation for nesting, and fenced code, which is kept verbatim.
+    `blocks` is the parsed content used by the Google Slides backend, a list of
+    (kind, depth, text) tuples where kind is heading, paragraph, bullet, number, code or blank.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.blocks = []
+
+    @property
+    def markdown(self):
+        start = 0
+        end = len(self.lines)
+        while start < end and not self.lines[start].strip():
+            start += 1
+        while end > start and not self.lines[end - 1].strip():
+            end -= 1
+        return '\n'.join(self.lines[start:end])
+
+    def is_empty(self):
+        return not any(line.strip() for line in self.lines)
+
+def parse_slides(content):
+    """Split a markdown deck into Slides in one pass over its lines.
+
+    Slides are separated by lines that are exactly '---'. A '---' inside a fenced code block,
+    a table rule or the middle of a line doesn't start a new slide.
+    """
+    slides = []
+    slide = Slide()
+    fence = None
+    # Indents of the enclosing list items; any deeper indent is one level further in
+    list_indents = []
+    for raw_line in content.splitlines():
+        if fence:
+            slide.lines.append(raw_line.rstrip())
+            if raw_line.strip().startswith(fence):
+                fence = None
+            else:
+                slide.blocks.append(('code', 0, raw_line.rstrip()))
+            continue
+
+        line = raw_line.strip()
+        if line == '---':
+            slides.append(slide)
+            slide = Slide()
+            list_indents = []
+            continue
+
+        match = FENCE_RE.match(raw_line)
+        if match:
+            fence = match.group(1)
+            slide.lines.append(line)
+            list_indents = []
+            continue
+
+        list_match = BULLET_RE.match(raw_line) or NUMBER_RE.match(raw_line)
+        if list_match:
+            indent = len(list_match.group(1).expandtabs(4))
+            while list_indents and list_indents[-1] > indent:
+                list_indents.pop()
+            if not list_indents or list_indents[-1] < indent:
+                list_indents.append(indent)
+            kind = 'bullet' if list_match.re is BULLET_RE else 'number'
+            slide.blocks.append((kind, len(list_indents) - 1, list_match.group(2).strip()))
+            slide.lines.append(raw_line.rstrip())
+            continue
+
+        if not line:
+            # Blank lines can separate items of the same list
+            slide.blocks.append(('blank', 0, ''))
+            slide.lines.append(line)
+            continue
+
+        if not raw_line[0].isspace():
+            # Unindented text ends the list; indented text continues the item above it
+            list_indents = []
+        if line.startswith('#'):
+            slide.blocks.append(('heading', len(line) - len(line.lstrip('#')), line.lstrip('#').strip()))
+            slide.lines.append(line)
+        else:
+            slide.blocks.append(('paragraph', 0, line))
+            slide.lines.append(line)
+    slides.append(slide)
+    return [slide for slide in slides if not slide.is_empty()]
 
 class SlideConverter:
     def __init__(self, markdown_file, output_dir):
@@ -20,6 +127,12 @@ class SlideConverter:
         self.output_dir = output_dir
         self.html_output = os.path.join(output_dir, 'presentation.html')
         self.reveal_dir = os.path.join(output_dir, 'reveal.js')
+        # Rendered slide fragments keyed by content hash, plus the slide order of the last build
+        self.cache_file = os.path.join(output_dir, '.slide_cache.json')
+        self.service = None
+        # Slides allows 60 write requests per minute per user by default
+        self.writes_per_minute = 60
+        self.last_write = 0.0
 
         self.reveal_template = '''
 <!doctype html>
@@ -139,9 +252,15 @@ class SlideConverter:
             },
             "type": "module"
         }
-        
-        with open(os.path.join(self.output_dir, 'package.json'), 'w') as f:
-            json.dump(package_json, f, indent=2)
+        package_text = json.dumps(package_json, indent=2)
+        package_path = os.path.join(self.output_dir, 'package.json')
+
+        # npm install and the copy only need to happen once per output directory
+        if os.path.isdir(self.reveal_dir) and self.read_file(package_path) == package_text:
+            return
+
+        with open(package_path, 'w') as f:
+            f.write(package_text)
 
         # Run npm install
         os.system(f'cd {self.output_dir} && npm install')
@@ -152,72 +271,97 @@ class SlideConverter:
             shutil.rmtree(self.reveal_dir)
         shutil.copytree(node_modules_reveal, self.reveal_dir)
 
-    def markdown_to_reveal(self):
-        """Convert markdown to Reveal.js HTML slides"""
+    @staticmethod
+    def read_file(path):
+        """Return the file's text, or None if it doesn't exist"""
         try:
-            print("\nDebug: Starting markdown conversion...")
-            os.makedirs(self.output_dir, exist_ok=True)
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
 
-            # Set up Reveal.js
-            print("Debug: Setting up Reveal.js...")
-            self.setup_reveal_js()
+    @staticmethod
+    def write_if_changed(path, content):
+        """Write content atomically, skipping the write if the file already has it"""
+        if SlideConverter.read_file(path) == content:
+            return False
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        # Readers (a browser reloading the deck) never see a half-written file
+        os.replace(tmp_path, path)
+        return True
 
-            # Read and process markdown content
-            print(f"Debug: Reading markdown file: {self.markdown_file}")
-            with open(self.markdown_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                print(f"Debug: Content length: {len(content)} characters")
-                if not content.strip():
-                    raise ValueError("Markdown file is empty")
-
-            # Split into slides and process each one
-            print("Debug: Splitting content into slides...")
-            slides = content.split('---')
-            print(f"Debug: Found {len(slides)} slide sections")
-            
-            if not slides:
-                raise ValueError("No slides found in markdown file")
-            
-            html_slides = []
-            for i, slide in enumerate(slides, 1):
-                if slide.strip():
-                    # Keep the markdown as is, let Reveal.js handle the conversion
-                    slide_content = slide.strip()
-                    # Ensure proper indentation and newlines for markdown content
-                    slide_content = '\n'.join(line.strip() for line in slide_content.split('\n'))
-                    slide_html = f'''<section data-markdown>
+    @staticmethod
+    def slide_hash(slide_content):
+        return hashlib.sha256(slide_content.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def render_slide(slide_content):
+        # Keep the markdown as is, let Reveal.js handle the conversion
+        return f'''<section data-markdown>
     <textarea data-template>
 {slide_content}
     </textarea>
 </section>'''
-                    html_slides.append(slide_html)
-                    print(f"Debug: Processed slide {i}, content length: {len(slide_content)}")
 
-            if not html_slides:
+    def load_cache(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def markdown_to_reveal(self, force=False):
+        """Convert markdown to Reveal.js HTML slides, re-rendering only slides that changed"""
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+
+            # Set up Reveal.js
+            self.setup_reveal_js()
+
+            # Read and process markdown content
+            content = self.read_file(self.markdown_file)
+            if content is None or not content.strip():
+                raise ValueError("Markdown file is empty")
+
+            slides = parse_slides(content)
+            if not slides:
                 raise ValueError("No valid slides generated")
 
+            # Fragments rendered with a different template can't be reused
+            template_hash = self.slide_hash(self.reveal_template)
+            cache = {} if force else self.load_cache()
+            cached_fragments = cache.get('fragments', {}) if cache.get('template') == template_hash else {}
+
+            hashes = []
+            fragments = {}
+            rendered = 0
+            for slide in slides:
+                digest = self.slide_hash(slide.markdown)
+                hashes.append(digest)
+                if digest in fragments:
+                    continue
+                fragment = cached_fragments.get(digest)
+                if fragment is None:
+                    fragment = self.render_slide(slide.markdown)
+                    rendered += 1
+                fragments[digest] = fragment
+
+            if (hashes == cache.get('slides') and cache.get('template') == template_hash
+                    and os.path.exists(self.html_output)):
+                print(f"No changes in {len(slides)} slides; {self.html_output} is up to date")
+                return self.html_output
+
             # Join all slides and create final HTML
-            print("Debug: Creating final HTML...")
-            all_slides = '\n'.join(html_slides)
-            print(f"Debug: Total slides HTML length: {len(all_slides)}")
-            
-            final_html = self.reveal_template.format(slides=all_slides)
-            print(f"Debug: Final HTML length: {len(final_html)}")
-            
-            # Write the HTML file
-            print(f"Debug: Writing to file: {self.html_output}")
-            with open(self.html_output, 'w', encoding='utf-8') as f:
-                f.write(final_html)
-                f.flush()
-                os.fsync(f.fileno())  # Ensure content is written to disk
-            
-            # Verify the file was written
-            if os.path.exists(self.html_output):
-                file_size = os.path.getsize(self.html_output)
-                print(f"Debug: File written successfully. Size: {file_size} bytes")
-            else:
-                print("Debug: Error - File does not exist after writing!")
-            
+            final_html = self.reveal_template.format(slides='\n'.join(fragments[digest] for digest in hashes))
+            self.write_if_changed(self.html_output, final_html)
+
+            # Only fragments still in the deck are kept, so the cache doesn't grow with every edit
+            cache = {'template': template_hash, 'slides': hashes, 'fragments': fragments}
+            self.write_if_changed(self.cache_file, json.dumps(cache))
+
+            print(f"Rendered {rendered} of {len(slides)} slides ({len(slides) - rendered} from cache)")
             return self.html_output
 
         except Exception as e:
@@ -228,6 +372,29 @@ class SlideConverter:
             print(f"- HTML output path: {self.html_output}")
             raise
 
+    def watch(self, interval=1.0):
+        """Rebuild the Reveal.js presentation whenever the markdown file changes"""
+        print(f"Watching {self.markdown_file} for changes (Ctrl+C to stop)...")
+        last_mtime = os.stat(self.markdown_file).st_mtime_ns
+        try:
+            while True:
+                time.sleep(interval)
+                try:
+                    mtime = os.stat(self.markdown_file).st_mtime_ns
+                except FileNotFoundError:
+                    # Editors that save by renaming remove the file for a moment
+                    continue
+                if mtime == last_mtime:
+                    continue
+                last_mtime = mtime
+                try:
+                    self.markdown_to_reveal()
+                except Exception:
+                    # Already reported; keep watching so the next save can fix it
+                    pass
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+
     def check_credentials_file(self):
         """Check if credentials.json exists and is valid"""
         if not os.path.exists('credentials.json'):
@@ -323,199 +490,575 @@ class SlideConverter:
         
         return creds
 
-    def create_google_slides(self):
-        """Convert HTML presentation to Google Slides"""
-        try:
-            creds = self.get_google_credentials()
-            service = build('slides', 'v1', credentials=creds)
-
-            # Get presentation title from markdown filename
-            title = os.path.splitext(os.path.basename(self.markdown_file))[0]
-
-            # Create new presentation
-            presentation = service.presentations().create(
-                body={'title': title}
-            ).execute()
-            presentation_id = presentation['presentationId']
-
-            # Delete the default slide
-            default_slide = service.presentations().get(
-                presentationId=presentation_id
-            ).execute()
-            if 'slides' in default_slide:
-                service.presentations().batchUpdate(
-                    presentationId=presentation_id,
-                    body={
-                        'requests': [{
-                            'deleteObject': {
-                                'objectId': default_slide['slides'][0]['objectId']
-                            }
-                        }]
-                    }
-                ).execute()
+    @staticmethod
+    def slide_text(slide):
+        """Return (title_text, body_text, has_bullets) for a parsed slide"""
+        title_text = ""
+        body_parts = []
+        has_bullets = False
+        in_list = False
 
-            # Read markdown content
-            with open(self.markdown_file, 'r') as f:
-                content = f.read()
-
-            # Split into slides and remove empty ones
-            slides = [slide.strip() for slide in content.split('---') if slide.strip()]
-            
-            # Prepare batch update requests
-            requests = []
-            
-            for slide_content in slides:
-                # Convert markdown to plain text
-                lines = slide_content.split('\n')
-                
-                # Extract title and body
-                title_text = ""
-                body_text = ""
-                has_bullets = False
-                current_list_type = None  # None, 'bullet', or 'number'
-                indent_level = 0
-                
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        body_text += '\n'
-                        continue
-                    
-                    if line.startswith('#'):
-                        if not title_text:  # Only use the first heading as title
-                            title_text = line.lstrip('#').strip()
-                    else:
-                        # Check for numbered list
-                        if line.lstrip().startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.', '0.')):
-                            number_text = line.lstrip().split('.', 1)[1].strip()
-                            body_text += number_text + '\n'
-                            has_bullets = True
-                            current_list_type = 'number'
-                        # Check for bullet list
-                        elif line.startswith('- '):
-                            body_text += line[2:] + '\n'
-                            has_bullets = True
-                            current_list_type = 'bullet'
-                        elif line.startswith('  - '):
-                            body_text += '    ' + line[4:] + '\n'
-                            has_bullets = True
-                            current_list_type = 'bullet'
-                        else:
-                            if current_list_type:
-                                body_text += '\n'  # Add extra line break before non-list content
-                            current_list_type = None
-                            body_text += line + '\n'
-
-                # Create a new slide
-                slide_id = str(uuid.uuid4())
+        for kind, depth, text in slide.blocks:
+            if kind == 'blank':
+                body_parts.append('\n')
+            elif kind == 'heading':
+                if not title_text:  # Only use the first heading as title
+                    title_text = text
+            elif kind in ('bullet', 'number'):
+                # Slides nests bullets by the number of leading tabs
+                body_parts.append('\t' * depth + text + '\n')
+                has_bullets = True
+                in_list = True
+            else:
+                if in_list:
+                    body_parts.append('\n')  # Add extra line break before non-list content
+                in_list = False
+                body_parts.append(text + '\n')
+
+        return title_text, ''.join(body_parts).strip('\n'), has_bullets
+
+    @staticmethod
+    def text_requests(slide_id, title_text, body_text, has_bullets):
+        """Requests that fill a slide's title and body placeholders"""
+        requests = []
+        if title_text:
+            requests.append({
+                'insertText': {
+                    'objectId': f'{slide_id}_title',
+                    'text': title_text
+                }
+            })
+        if body_text:
+            requests.append({
+                'insertText': {
+                    'objectId': f'{slide_id}_body',
+                    'text': body_text
+                }
+            })
+
+            # Add bullet points if needed
+            if has_bullets:
                 requests.append({
-                    'createSlide': {
-                        'objectId': slide_id,
-                        'slideLayoutReference': {
-                            'predefinedLayout': 'TITLE_AND_BODY'
+                    'createParagraphBullets': {
+                        'objectId': f'{slide_id}_body',
+                        'textRange': {
+                            'type': 'ALL'
                         },
-                        'placeholderIdMappings': [
-                            {
-                                'layoutPlaceholder': {
-                                    'type': 'TITLE'
-                                },
-                                'objectId': f'{slide_id}_title'
-                            },
-                            {
-                                'layoutPlaceholder': {
-                                    'type': 'BODY'
-                                },
-                                'objectId': f'{slide_id}_body'
-                            }
-                        ]
+                        'bulletPreset': 'BULLET_DISC_CIRCLE_SQUARE'
                     }
                 })
+        return requests
 
-                # Add title text
-                if title_text:
-                    requests.append({
-                        'insertText': {
-                            'objectId': f'{slide_id}_title',
-                            'text': title_text
-                        }
-                    })
-
-                # Add body text
-                if body_text:
-                    requests.append({
-                        'insertText': {
-                            'objectId': f'{slide_id}_body',
-                            'text': body_text.strip()
-                        }
-                    })
-
-                    # Add bullet points if needed
-                    if has_bullets:
-                        requests.append({
-                            'createParagraphBullets': {
-                                'objectId': f'{slide_id}_body',
-                                'textRange': {
-                                    'type': 'ALL'
-                                },
-                                'bulletPreset': 'BULLET_DISC_CIRCLE_SQUARE'
-                            }
-                        })
-
-            # Execute all requests in one batch
-            if requests:
-                service.presentations().batchUpdate(
-                    presentationId=presentation_id,
-                    body={'requests': requests}
-                ).execute()
-
-            # Save presentation info
+    @staticmethod
+    def create_slide_request(slide_id, insertion_index):
+        return {
+            'createSlide': {
+                'objectId': slide_id,
+                'insertionIndex': insertion_index,
+                'slideLayoutReference': {
+                    'predefinedLayout': 'TITLE_AND_BODY'
+                },
+                'placeholderIdMappings': [
+                    {
+                        'layoutPlaceholder': {
+                            'type': 'TITLE'
+                        },
+                        'objectId': f'{slide_id}_title'
+                    },
+                    {
+                        'layoutPlaceholder': {
+                            'type': 'BODY'
+                        },
+                        'objectId': f'{slide_id}_body'
+                    }
+                ]
+            }
+        }
+
+    @staticmethod
+    def clear_text_requests(entry):
+        """Requests that empty a previously synced slide before new text goes in"""
+        requests = []
+        slide_id = entry['object_id']
+        if entry.get('title'):
+            requests.append({'deleteText': {'objectId': f'{slide_id}_title', 'textRange': {'type': 'ALL'}}})
+        if entry.get('body'):
+            requests.append({'deleteText': {'objectId': f'{slide_id}_body', 'textRange': {'type': 'ALL'}}})
+        return requests
+
+    @staticmethod
+    def stable_slides(positions):
+        """Return the indexes of the longest increasing run in positions (slides that can stay put)"""
+        tails = []      # tails[k]: index into positions of the smallest tail of a run of length k + 1
+        previous = [-1] * len(positions)
+        for i, position in enumerate(positions):
+            low, high = 0, len(tails)
+            while low < high:
+                mid = (low + high) // 2
+                if positions[tails[mid]] < position:
+                    low = mid + 1
+                else:
+                    high = mid
+            if low:
+                previous[i] = tails[low - 1]
+            if low == len(tails):
+                tails.append(i)
+            else:
+                tails[low] = i
+        stable = set()
+        i = tails[-1] if tails else -1
+        while i != -1:
+            stable.add(i)
+            i = previous[i]
+        return stable
+
+    def plan_sync(self, slides, synced, current_ids):
+        """Work out the requests that turn the presentation into `slides`.
+
+        `synced` is the slide map from the last sync (hash, object_id and which placeholders had
+        text), `current_ids` the slide order in the presentation now. Slides whose hash is
+        unchanged are kept, edited slides are rewritten in place, and only what is left over is
+        created or deleted. Moves are limited to slides outside the longest run that is already
+        in order. Returns (request groups, new slide map, counts). Each group holds the requests
+        for one slide and that slide's new map entry (None when it is deleted); a group must not
+        be split across batchUpdate calls.
+        """
+        by_hash = {}
+        for entry in synced:
+            by_hash.setdefault(entry['hash'], []).append(entry)
+        # Reversed so pop() hands identical slides their objects in the same order as last time
+        for entries in by_hash.values():
+            entries.reverse()
+
+        # Unchanged slides keep their object, wherever they are in the deck
+        hashes = [self.slide_hash(slide.markdown) for slide in slides]
+        targets = [None] * len(slides)
+        for i, digest in enumerate(hashes):
+            matches = by_hash.get(digest)
+            if matches:
+                targets[i] = matches.pop()
+        positions = {object_id: index for index, object_id in enumerate(current_ids)}
+        leftovers = [entry for entries in by_hash.values() for entry in entries]
+        leftovers.sort(key=lambda entry: positions[entry['object_id']], reverse=True)
+
+        # Edited slides reuse a leftover object in deck order; the rest are new or deleted
+        updated = set()
+        for i in range(len(slides)):
+            if targets[i] is None and leftovers:
+                targets[i] = leftovers.pop()
+                updated.add(i)
+
+        groups = []
+        deleted = {entry['object_id'] for entry in leftovers}
+        for entry in leftovers:
+            groups.append({
+                'requests': [{'deleteObject': {'objectId': entry['object_id']}}],
+                'object_id': entry['object_id'],
+                'entry': None,
+            })
+        current = [object_id for object_id in current_ids if object_id not in deleted]
+        positions = {object_id: index for index, object_id in enumerate(current)}
+
+        kept = [i for i in range(len(slides)) if targets[i] is not None]
+        stable = {kept[k] for k in self.stable_slides([positions[targets[i]['object_id']] for i in kept])}
+
+        # Deck order without list.insert/index. Slot 0 holds slides placed at the front and slot
+        # p + 1 the slide at positions[...] == p plus everything placed straight after it. Slides
+        # are placed in deck order after the previous one, so that one is always last in its slot
+        # and its index is the number of slides in slots up to its own: a Fenwick tree prefix sum.
+        tree = [0] * (len(current) + 2)
+        for slot in range(1, len(current) + 1):
+            tree[slot + 1] += 1
+            parent = slot + 1 + ((slot + 1) & -(slot + 1))
+            if parent < len(tree):
+                tree[parent] += tree[slot + 1]
+
+        def add(slot, delta):
+            slot += 1
+            while slot < len(tree):
+                tree[slot] += delta
+                slot += slot & -slot
+
+        def slides_up_to(slot):
+            total = 0
+            slot += 1
+            while slot > 0:
+                total += tree[slot]
+                slot -= slot & -slot
+            return total
+
+        slide_map = []
+        counts = {'created': 0, 'updated': len(updated), 'deleted': len(leftovers), 'moved': 0, 'unchanged': 0}
+        # Slot of the previous slide in deck order
+        previous_slot = 0
+        for i, slide in enumerate(slides):
+            entry = targets[i]
+            if entry is not None and i in stable and i not in updated:
+                # Same content as last time, so the recorded entry still describes it
+                counts['unchanged'] += 1
+                slide_map.append(entry)
+                previous_slot = positions[entry['object_id']] + 1
+                continue
+
+            title_text, body_text, has_bullets = self.slide_text(slide)
+            slide_id = entry['object_id'] if entry else str(uuid.uuid4())
+            # Both createSlide and updateSlidesPosition count from the deck before the request
+            insertion_index = slides_up_to(previous_slot)
+            group = []
+
+            if entry is None:
+                group.append(self.create_slide_request(slide_id, insertion_index))
+                add(previous_slot, 1)
+                counts['created'] += 1
+            elif i not in stable:
+                group.append({'updateSlidesPosition': {'slideObjectIds': [slide_id], 'insertionIndex': insertion_index}})
+                add(positions[slide_id] + 1, -1)
+                add(previous_slot, 1)
+                counts['moved'] += 1
+            else:
+                previous_slot = positions[slide_id] + 1
+
+            if entry is None or i in updated:
+                if entry is not None:
+                    group.extend(self.clear_text_requests(entry))
+                group.extend(self.text_requests(slide_id, title_text, body_text, has_bullets))
+                if entry is not None and entry.get('bullets') and not has_bullets and body_text:
+                    group.append({'deleteParagraphBullets': {'objectId': f'{slide_id}_body', 'textRange': {'type': 'ALL'}}})
+
+            new_entry = {
+                'hash': hashes[i],
+                'object_id': slide_id,
+                'title': bool(title_text),
+                'body': bool(body_text),
+                'bullets': has_bullets and bool(body_text),
+            }
+            if group:
+                groups.append({'requests': group, 'object_id': slide_id, 'entry': new_entry})
+            slide_map.append(new_entry)
+
+        return groups, slide_map, counts
+
+    @staticmethod
+    def chunk_requests(groups):
+        """Pack request groups into batchUpdate-sized chunks of whole groups.
+
+        batchUpdate applies a call's requests all-or-nothing, so keeping each slide's group in one
+        call means a failure never leaves a half-built slide behind. A group that is over the
+        limits on its own still gets a chunk of its own.
+        """
+        chunk = []
+        count = 0
+        size = 0
+        for group in groups:
+            group_size = len(json.dumps(group['requests']))
+            if chunk and (count + len(group['requests']) > MAX_BATCH_REQUESTS or size + group_size > MAX_BATCH_BYTES):
+                yield chunk
+                chunk = []
+                count = 0
+                size = 0
+            chunk.append(group)
+            count += len(group['requests'])
+            size += group_size
+        if chunk:
+            yield chunk
+
+    def reauthenticate(self):
+        """Drop the saved token, sign in again and rebuild the Slides client"""
+        print("\nAuthentication failed. Trying to reauthenticate...")
+        token_path = os.path.join(self.output_dir, 'token.pickle')
+        if os.path.exists(token_path):
+            os.remove(token_path)
+        self.service = build('slides', 'v1', credentials=self.get_google_credentials())
+
+    def execute(self, make_request, write=False, applied=None):
+        """Execute a Slides API call, retrying rate limits, server errors and one expired grant.
+
+        make_request builds the request from self.service, so a retry after reauthenticating
+        uses the new client. Writes are paced to stay under the per-minute write quota.
+
+        A write that timed out or failed with a server error may still have been applied, and
+        resending it can fail (e.g. creating an object ID that now exists). When applied is given
+        it is asked before each such retry, and a True answer ends the call with None.
+        """
+        reauthenticated = False
+        attempt = 0
+        ambiguous = False
+        while True:
+            if ambiguous and applied is not None and applied():
+                print("  The failed call had been applied; not sending it again")
+                return None
+            if write:
+                wait = self.last_write + 60.0 / self.writes_per_minute - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                self.last_write = time.monotonic()
+            try:
+                return make_request().execute()
+            except (HttpError, RefreshError) as e:
+                if "invalid_grant" in str(e) and not reauthenticated:
+                    self.reauthenticate()
+                    reauthenticated = True
+                    continue
+                status = getattr(getattr(e, 'resp', None), 'status', None)
+                if status not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+                    raise
+                retry_after = e.resp.get('retry-after')
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else \
+                    min(MAX_BACKOFF, 2 ** attempt) + random.random()
+                # 429 means the call was rejected before it ran
+                ambiguous = write and status != 429
+            except (ConnectionError, TimeoutError) as e:
+                if attempt >= MAX_RETRIES:
+                    raise
+                status = type(e).__name__
+                delay = min(MAX_BACKOFF, 2 ** attempt) + random.random()
+                ambiguous = write
+            attempt += 1
+            print(f"  Slides API error {status}, retrying in {delay:.1f}s ({attempt}/{MAX_RETRIES})")
+            time.sleep(delay)
+
+    def execute_requests(self, presentation_id, groups, on_commit=None):
+        """Send request groups in bounded batchUpdate calls, returning the number of calls.
+
+        on_commit is called with each chunk's groups once Slides has applied them, so progress
+        can be saved and an interrupted sync picks up after the last committed chunk.
+        """
+        chunks = list(self.chunk_requests(groups))
+        total_requests = sum(len(group['requests']) for group in groups)
+        sent_requests = 0
+        sent_groups = 0
+        for number, chunk in enumerate(chunks, 1):
+            requests = [request for group in chunk for request in group['requests']]
+            self.execute(lambda: self.service.presentations().batchUpdate(
+                presentationId=presentation_id,
+                body={'requests': requests}
+            ), write=True, applied=lambda: self.chunk_applied(presentation_id, requests))
+            sent_requests += len(requests)
+            sent_groups += len(chunk)
+            if on_commit:
+                on_commit(chunk)
+            if len(chunks) > 1:
+                print(f"  Batch {number}/{len(chunks)}: {sent_requests}/{total_requests} requests, "
+                      f"{sent_groups}/{len(groups)} slide changes applied")
+        return len(chunks)
+
+    def chunk_applied(self, presentation_id, requests):
+        """Tell from the presentation whether a batchUpdate's requests were applied.
+
+        batchUpdate is all-or-nothing, so slides it creates existing (or slides it deletes being
+        gone) means the whole call went through. Calls that only rewrite text are checked by
+        reading the placeholders back: resending them would insert text into a placeholder a
+        second time, or delete text from one that is already empty. Calls that only move slides
+        are safe to resend.
+        """
+        created = {request['createSlide']['objectId'] for request in requests if 'createSlide' in request}
+        deleted = {request['deleteObject']['objectId'] for request in requests if 'deleteObject' in request}
+        if created or deleted:
+            current_ids = self.get_slide_ids(presentation_id)
+            if current_ids is None:
+                return False
+            current_ids = set(current_ids)
+            return created <= current_ids and not deleted & current_ids
+
+        # Placeholder object ID -> [text, bullets] the call leaves behind; bullets is None if untouched
+        expected = {}
+        for request in requests:
+            (kind, fields), = request.items()
+            if kind == 'deleteText':
+                expected.setdefault(fields['objectId'], ['', None])[0] = ''
+            elif kind == 'insertText':
+                expected.setdefault(fields['objectId'], ['', None])[0] = fields['text']
+            elif kind in ('createParagraphBullets', 'deleteParagraphBullets') and fields['objectId'] in expected:
+                expected[fields['objectId']][1] = kind == 'createParagraphBullets'
+        if not expected:
+            return False
+
+        actual = self.get_placeholder_text(presentation_id)
+        for object_id, (text, bullets) in expected.items():
+            if object_id not in actual:
+                return False
+            actual_text, actual_bullets = actual[object_id]
+            if bullets:
+                # Slides turns the leading tabs of bulleted paragraphs into nesting levels
+                text = '\n'.join(line.lstrip('\t') for line in text.split('\n'))
+            if actual_text != text or (bullets is not None and actual_bullets != bullets):
+                return False
+        return True
+
+    def get_placeholder_text(self, presentation_id):
+        """Return {shape object ID: (text, has_bullets)} for every shape in the presentation"""
+        presentation = self.execute(lambda: self.service.presentations().get(
+            presentationId=presentation_id,
+            fields='slides.pageElements(objectId,shape.text.textElements(textRun.content,paragraphMarker.bullet))'
+        ))
+        shapes = {}
+        for slide in presentation.get('slides', []):
+            for element in slide.get('pageElements', []):
+                text_elements = element.get('shape', {}).get('text', {}).get('textElements', [])
+                text = ''.join(item['textRun']['content'] for item in text_elements if 'textRun' in item)
+                bullets = any('bullet' in item.get('paragraphMarker', {}) for item in text_elements)
+                # Shapes with text always end in a newline that insertText didn't add
+                shapes[element['objectId']] = (text[:-1] if text.endswith('\n') else text, bullets)
+        return shapes
+
+    def create_presentation(self, title):
+        """Create an empty presentation and return its ID"""
+        presentation = self.execute(lambda: self.service.presentations().create(
+            body={'title': title}
+        ), write=True)
+        presentation_id = presentation['presentationId']
+
+        # Delete the default slide
+        default_slide = self.execute(lambda: self.service.presentations().get(
+            presentationId=presentation_id
+        ))
+        if 'slides' in default_slide:
+            requests = [{
+                'deleteObject': {
+                    'objectId': default_slide['slides'][0]['objectId']
+                }
+            }]
+            self.execute(lambda: self.service.presentations().batchUpdate(
+                presentationId=presentation_id,
+                body={'requests': requests}
+            ), write=True, applied=lambda: self.chunk_applied(presentation_id, requests))
+        return presentation_id
+
+    def get_slide_ids(self, presentation_id):
+        """Return the presentation's slide object IDs in order, or None if it no longer exists"""
+        try:
+            presentation = self.execute(lambda: self.service.presentations().get(
+                presentationId=presentation_id,
+                fields='slides.objectId'
+            ))
+        except HttpError as e:
+            if e.resp is not None and e.resp.status == 404:
+                return None
+            raise
+        return [slide['objectId'] for slide in presentation.get('slides', [])]
+
+    def load_json(self, path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def save_json(path, data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def create_google_slides(self, new_presentation=False):
+        """Sync the markdown slides to Google Slides, creating the presentation on first use"""
+        try:
+            creds = self.get_google_credentials()
+            self.service = build('slides', 'v1', credentials=creds)
+
+            info_file = os.path.join(self.output_dir, 'presentation_info.json')
+            map_file = os.path.join(self.output_dir, 'presentation_slides.json')
+
+            # Read markdown content
+            with open(self.markdown_file, 'r') as f:
+                slides = parse_slides(f.read())
+
+            presentation_id = None if new_presentation else self.load_json(info_file).get('presentation_id')
+            current_ids = self.get_slide_ids(presentation_id) if presentation_id else None
+            if current_ids is None:
+                # Get presentation title from markdown filename
+                title = os.path.splitext(os.path.basename(self.markdown_file))[0]
+                presentation_id = self.create_presentation(title)
+                current_ids = []
+                synced = []
+            else:
+                slide_map = self.load_json(map_file)
+                synced = slide_map.get('slides', []) if slide_map.get('presentation_id') == presentation_id else []
+                # Slides deleted by hand since the last sync are created again
+                present = set(current_ids)
+                synced = [entry for entry in synced if entry['object_id'] in present]
+
+            # Save presentation info before uploading, so an interrupted first upload resumes into it
             presentation_info = {
                 'presentation_id': presentation_id,
                 'url': f"https://docs.google.com/presentation/d/{presentation_id}"
             }
-            
-            info_file = os.path.join(self.output_dir, 'presentation_info.json')
-            with open(info_file, 'w') as f:
-                json.dump(presentation_info, f, indent=2)
+            self.save_json(info_file, presentation_info)
+
+            groups, slide_map, counts = self.plan_sync(slides, synced, current_ids)
 
-            print(f"Created Google Slides presentation with ID: {presentation_id}")
+            # The slide map always describes what Slides has applied, so the next run diffs
+            # against the real presentation and only sends what is still missing
+            committed = {entry['object_id']: entry for entry in synced}
+
+            def save_progress(chunk):
+                for group in chunk:
+                    if group['entry'] is None:
+                        committed.pop(group['object_id'], None)
+                    else:
+                        committed[group['object_id']] = group['entry']
+                self.save_json(map_file, {'presentation_id': presentation_id, 'slides': list(committed.values())})
+
+            calls = self.execute_requests(presentation_id, groups, save_progress)
+            self.save_json(map_file, {'presentation_id': presentation_id, 'slides': slide_map})
+
+            unmanaged = len(set(current_ids) - {entry['object_id'] for entry in synced})
+            print(f"Synced {len(slides)} slides to presentation {presentation_id}: "
+                  f"{counts['created']} created, {counts['updated']} updated, {counts['deleted']} deleted, "
+                  f"{counts['moved']} moved, {counts['unchanged']} unchanged "
+                  f"({sum(len(group['requests']) for group in groups)} requests in {calls} batchUpdate calls)")
+            if unmanaged:
+                print(f"Left {unmanaged} slides that were not created by this script in place")
             print(f"Access it at: {presentation_info['url']}")
             return presentation_id
-            
-        except HttpError as e:
+
+        except (HttpError, RefreshError) as e:
             print(f"Google API Error: {str(e)}")
-            if "invalid_grant" in str(e):
-                print("\nAuthentication failed. Trying to reauthenticate...")
-                token_path = os.path.join(self.output_dir, 'token.pickle')
-                if os.path.exists(token_path):
-                    os.remove(token_path)
-                return self.create_google_slides()
+            print("Slides that were already uploaded are recorded; run again to resume.")
             sys.exit(1)
         except Exception as e:
             print(f"Error: {str(e)}")
             sys.exit(1)
 
+def positive_int(value):
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(description='Convert markdown slides to Reveal.js and optionally Google Slides')
     parser.add_argument('--slides', required=True, help='Path to the markdown slides file')
     parser.add_argument('--output', required=True, help='Output directory for generated files')
     parser.add_argument('--gslides', action='store_true', help='Also convert to Google Slides')
+    parser.add_argument('--new-presentation', action='store_true',
+                        help='Create a new Google Slides presentation instead of syncing the previous one')
+    parser.add_argument('--writes-per-minute', type=positive_int, default=60,
+                        help='Google Slides write quota to stay under (default: 60, the per-user default)')
+    parser.add_argument('--full', action='store_true', help='Re-render every slide instead of reusing cached ones')
+    parser.add_argument('--watch', action='store_true', help='Keep running and rebuild the HTML when the markdown changes')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between change checks in --watch mode')
     
     args = parser.parse_args()
     
     converter = SlideConverter(args.slides, args.output)
+    converter.writes_per_minute = args.writes_per_minute
     
     print("Converting to Reveal.js HTML...")
-    html_file = converter.markdown_to_reveal()
+    html_file = converter.markdown_to_reveal(force=args.full)
     print(f"Created Reveal.js presentation at: {html_file}")
     
     if args.gslides:
         print("\nConverting to Google Slides...")
         try:
-            presentation_id = converter.create_google_slides()
+            presentation_id = converter.create_google_slides(args.new_presentation)
         except Exception as e:
             print(f"Error creating Google Slides: {str(e)}")
             sys.exit(1)
 
+    if args.watch:
+        converter.watch(args.interval)
+
 if __name__ == "__main__":
     main() 
@@ -1,6 +1,17 @@
 import os
-import requests
+import io
+import re
+import sys
+import json
+import math
+import time
+import zipfile
+import threading
 import argparse
+import concurrent.futures
+from collections import Counter, deque
+
+import requests
 
 
 '''
@@ -10,12 +21,80 @@ Usage:
 python3 notebook_extract.py --token <tokengoeshere> --base-url <https://urlgoeshere/api/2.0> --action test
 python3 notebook_extract.py --token <tokengoeshere> --base-url <https://urlgoeshere/api/2.0> --action list
 python3 notebook_extract.py --token <tokengoeshere> --base-url <https://urlgoeshere/api/2.0> --action download
+python3 notebook_extract.py --token <tokengoeshere> --base-url <https://urlgoeshere/api/2.0> --action download --scan --jobs 8
+python3 notebook_extract.py --action scan --findings findings.ndjson
+
+--scan triages every notebook for secrets as it is exported (one pass over the data) and
+writes findings as NDJSON (one JSON object per line with path, line, column and offset).
+--action scan runs the same scanner over an existing exported_notebooks directory.
 '''
 
+# Named secret patterns, combined into a single alternation so each file is scanned once.
+# The trailing high_entropy rule catches generic tokens and is filtered by Shannon entropy.
+SECRET_PATTERNS = [
+    ("databricks_token", r"dapi[0-9a-f]{32}(?:-\d+)?"),
+    ("aws_access_key_id", r"(?:AKIA|ASIA)[0-9A-Z]{16}"),
+    ("aws_secret_access_key", r"(?i:aws.{0,20}?secret.{0,20}?['\"][0-9a-zA-Z/+]{40}['\"])"),
+    ("github_token", r"gh[pousr]_[A-Za-z0-9]{36,}"),
+    ("slack_token", r"xox[baprs]-[A-Za-z0-9-]{10,}"),
+    ("google_api_key", r"AIza[0-9A-Za-z_\-]{35}"),
+    ("azure_storage_key", r"AccountKey=[A-Za-z0-9+/=]{80,}"),
+    ("private_key", r"-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP )?PRIVATE KEY-----"),
+    ("jwt", r"eyJ[A-Za-z0-9_-]{10,}\.eyJ[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}"),
+    ("connection_string", r"(?:jdbc:)?(?:postgres(?:ql)?|mysql|sqlserver|mongodb(?:\+srv)?|redis)://[^\s'\":/]+:[^\s'\"@]+@[^\s'\"]+"),
+    ("password_assignment", r"(?i:(?:password|passwd|pwd|secret|token|api_?key)[\"']?\s*[:=]\s*[\"'][^\"'\s]{6,}[\"'])"),
+    ("high_entropy", r"(?<![A-Za-z0-9+/_\-])[A-Za-z0-9+/_\-]{24,256}={0,2}(?![A-Za-z0-9+/_\-=])"),
+]
+# Runs too long to be a token (base64 cell output such as images) are matched only so the scan skips past them
+ENCODED_BLOB_PATTERN = ("encoded_blob", r"(?<![A-Za-z0-9+/_\-])[A-Za-z0-9+/_\-]{257,}={0,2}")
+SECRET_REGEX = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in SECRET_PATTERNS + [ENCODED_BLOB_PATTERN]))
+# Paths and identifiers built from words land around 4.0-4.2, so keep well clear of them
+ENTROPY_THRESHOLD = 4.5
+# Longest match written to a finding; longer values are cut short and their length recorded
+MAX_MATCH_CHARS = 200
+# Scan tasks queued per worker process before submit() waits, so exports are never buffered in full
+TASKS_PER_WORKER = 2
+FINDINGS_FILE = "secret_findings.ndjson"
+EXPORT_DIR = "exported_notebooks"
+MAX_RETRIES = 5
 
+# One pooled session for every call so list/export reuse keep-alive connections
+session = requests.Session()
+
+def api_get(url, headers, params=None):
+    """GET with bounded retries on 429 / 503, honouring Retry-After."""
+    for attempt in range(MAX_RETRIES + 1):
+        response = session.get(url, headers=headers, params=params)
+        if response.status_code not in (429, 503) or attempt == MAX_RETRIES:
+            return response
+        try:
+            delay = float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            delay = 0.5 * 2 ** attempt
+        time.sleep(min(delay, 30))
+
+def iter_workspace_objects(headers, base_url, path="/"):
+    """Walk the workspace tree breadth-first via workspace/list, yielding every object."""
+    list_url = base_url + "workspace/list"
+    pending = deque([path])
+    while pending:
+        current = pending.popleft()
+        response = api_get(list_url, headers, params={"path": current})
+        if response.status_code != 200:
+            print(f"Failed to list '{current}': {response.text}", file=sys.stderr)
+            continue
+        for obj in response.json().get("objects", []):
+            if obj.get("object_type") in ("DIRECTORY", "REPO"):
+                pending.append(obj["path"])
+            yield obj
+
+def iter_notebooks(headers, base_url, path="/"):
+    for obj in iter_workspace_objects(headers, base_url, path):
+        if obj.get("object_type") == "NOTEBOOK":
+            yield obj
 
 def test_authentication(headers, base_url):
-    response = requests.get(base_url, headers=headers)
+    response = api_get(base_url + "workspace/list", headers, params={"path": "/"})
 
     if response.status_code == 200:
         print("Authentication successful. API token has access to the base URL.")
@@ -23,51 +102,184 @@ def test_authentication(headers, base_url):
         print("Authentication failed. API token does not have access to the base URL.")
 
 def list_notebooks(headers, base_url):
-    notebooks_url = base_url + "workspace/list"
-    response = requests.get(notebooks_url, headers=headers)
+    print("List of Notebooks:")
+    for obj in iter_workspace_objects(headers, base_url):
+        print(obj["path"])
 
-    if response.status_code == 200:
-        notebooks = response.json().get("objects", [])
-        print("List of Notebooks:")
-        for notebook in notebooks:
-            print(notebook["path"])
-    else:
-        print("Failed to fetch notebooks:", response.text)
+def export_notebooks(headers, base_url, scanner=None, output_dir=EXPORT_DIR):
+    export_url = base_url + "workspace/export"
 
-def export_notebooks(headers, base_url):
-    notebooks_url = base_url + "workspace/export"
-    response = requests.get(notebooks_url, headers=headers)
-    
-    if response.status_code == 200:
-        notebooks = response.json().get("objects", [])
-        for notebook in notebooks:
-            notebook_path = notebook["path"]
-            notebook_name = os.path.basename(notebook_path)
-            export_path = os.path.join("exported_notebooks", notebook_name + ".dbc")
-            
-            export_payload = {
-                "path": notebook_path
-            }
-            
-            export_response = requests.post(notebooks_url, json=export_payload, headers=headers)
-            
-            if export_response.status_code == 200:
-                with open(export_path, "wb") as f:
-                    f.write(export_response.content)
-                print(f"Notebook '{notebook_name}' exported to '{export_path}'")
-            else:
-                print(f"Failed to export notebook '{notebook_name}': {export_response.text}")
-    else:
-        print("Failed to fetch notebooks:", response.text)
+    for notebook in iter_notebooks(headers, base_url):
+        notebook_path = notebook["path"]
+        notebook_name = os.path.basename(notebook_path)
+        # Mirror the workspace layout so notebooks with the same name in different folders don't collide
+        export_path = os.path.join(output_dir, notebook_path.lstrip("/") + ".dbc")
+        os.makedirs(os.path.dirname(export_path), exist_ok=True)
+
+        export_params = {
+            "path": notebook_path,
+            "format": "DBC",
+            "direct_download": "true"
+        }
+
+        export_response = api_get(export_url, headers, params=export_params)
+
+        if export_response.status_code == 200:
+            with open(export_path, "wb") as f:
+                f.write(export_response.content)
+            if scanner is not None:
+                scanner.submit(export_path, export_response.content)
+            print(f"Notebook '{notebook_name}' exported to '{export_path}'")
+        else:
+            print(f"Failed to export notebook '{notebook_name}': {export_response.text}")
+
+def shannon_entropy(value):
+    counts = Counter(value)
+    length = len(value)
+    return -sum(c / length * math.log2(c / length) for c in counts.values())
+
+def scan_text(path, text):
+    """Return secret findings for one text blob, with 1-based line/column and char offset."""
+    findings = []
+    line = 1
+    line_start = 0
+    last = 0
+    for match in SECRET_REGEX.finditer(text):
+        rule = match.lastgroup
+        value = match.group()
+        entropy = None
+        if rule == "encoded_blob":
+            continue
+        if rule == "high_entropy":
+            # Absolute paths (/mnt/..., /databricks-datasets/..., s3://...) aren't tokens
+            if value.startswith("/"):
+                continue
+            entropy = shannon_entropy(value)
+            if entropy < ENTROPY_THRESHOLD:
+                continue
 
+        # Advance the line counter incrementally so the whole file stays a single pass
+        newlines = text.count("\n", last, match.start())
+        if newlines:
+            line += newlines
+            line_start = text.rfind("\n", last, match.start()) + 1
+        last = match.start()
+
+        finding = {
+            "path": path,
+            "rule": rule,
+            "line": line,
+            "column": match.start() - line_start + 1,
+            "offset": match.start(),
+            "match": value if len(value) <= MAX_MATCH_CHARS else value[:MAX_MATCH_CHARS] + "...",
+        }
+        if len(value) > MAX_MATCH_CHARS:
+            finding["length"] = len(value)
+        if entropy is not None:
+            finding["entropy"] = round(entropy, 2)
+        findings.append(finding)
+    return findings
+
+def scan_content(path, data):
+    """Scan exported bytes; DBC archives are zips, so each member is scanned separately."""
+    if data[:4] == b"PK\x03\x04":
+        findings = []
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for member in archive.namelist():
+                    member_text = archive.read(member).decode("utf-8", errors="replace")
+                    findings.extend(scan_text(f"{path}!{member}", member_text))
+            return findings
+        except zipfile.BadZipFile:
+            pass
+    return scan_text(path, data.decode("utf-8", errors="replace"))
+
+def scan_file(path):
+    with open(path, "rb") as f:
+        return scan_content(path, f.read())
+
+class SecretScanStage:
+    """Process-pool secret scanner that writes NDJSON findings as each file completes."""
+
+    def __init__(self, findings_path=FINDINGS_FILE, jobs=None):
+        jobs = jobs or os.cpu_count() or 1
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+        self.output = sys.stdout if findings_path == "-" else open(findings_path, "w")
+        self.lock = threading.Lock()
+        # Bounds the files held in the queue; submit() blocks the export loop until a slot frees up
+        self.slots = threading.BoundedSemaphore(jobs * TASKS_PER_WORKER)
+        self.pending = set()
+        self.total = 0
+
+    def _write(self, future):
+        try:
+            findings = future.result()
+        except Exception as e:
+            print(f"Secret scan failed: {e}", file=sys.stderr)
+            return
+        else:
+            with self.lock:
+                for finding in findings:
+                    self.output.write(json.dumps(finding) + "\n")
+                self.total += len(findings)
+        finally:
+            with self.lock:
+                self.pending.discard(future)
+            self.slots.release()
+
+    def _submit(self, func, *args):
+        self.slots.acquire()
+        future = self.executor.submit(func, *args)
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self._write)
+
+    def submit(self, path, data):
+        self._submit(scan_content, path, data)
+
+    def submit_file(self, path):
+        self._submit(scan_file, path)
+
+    def close(self):
+        with self.lock:
+            pending = list(self.pending)
+        concurrent.futures.wait(pending)
+        self.executor.shutdown()
+        self.output.flush()
+        if self.output is not sys.stdout:
+            self.output.close()
+        print(f"Secret scan complete: {self.total} finding(s)", file=sys.stderr)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def scan_directory(directory, scanner):
+    for dirpath, _, filenames in os.walk(directory):
+        for filename in filenames:
+            scanner.submit_file(os.path.join(dirpath, filename))
 
 def main():
     parser = argparse.ArgumentParser(description="Databricks API Interaction")
-    parser.add_argument("--token", required=True, help="Databricks API token")
-    parser.add_argument("--action", required=True, choices=["list", "download", "test"], help="Action: list, download, or test")
-    parser.add_argument("--base-url", required=True, help="Databricks base URL")
+    parser.add_argument("--token", help="Databricks API token")
+    parser.add_argument("--action", required=True, choices=["list", "download", "test", "scan"], help="Action: list, download, test, or scan")
+    parser.add_argument("--base-url", help="Databricks base URL")
+    parser.add_argument("--scan", action="store_true", help="Scan notebooks for secrets while downloading")
+    parser.add_argument("--scan-dir", default=EXPORT_DIR, help="Directory to scan with --action scan")
+    parser.add_argument("--findings", default=FINDINGS_FILE, help="NDJSON findings output file, or - for stdout")
+    parser.add_argument("--jobs", type=int, default=None, help="Scanner worker processes (default: CPU count)")
     args = parser.parse_args()
 
+    if args.action == "scan":
+        with SecretScanStage(args.findings, args.jobs) as scanner:
+            scan_directory(args.scan_dir, scanner)
+        return
+
+    if not args.token or not args.base_url:
+        parser.error("--token and --base-url are required for list, download and test")
+
     headers = {
         "Authorization": f"Bearer {args.token}"
     }
@@ -79,9 +291,12 @@ def main():
     elif args.action == "list":
         list_notebooks(headers, base_url)
     elif args.action == "download":
-        if not os.path.exists("exported_notebooks"):
-            os.makedirs("exported_notebooks")
-        export_notebooks(headers, base_url)
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        if args.scan:
+            with SecretScanStage(args.findings, args.jobs) as scanner:
+                export_notebooks(headers, base_url, scanner)
+        else:
+            export_notebooks(headers, base_url)
 
 if __name__ == "__main__":
     main()
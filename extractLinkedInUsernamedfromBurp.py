@@ -1,22 +1,77 @@
+import os
+import sys
 import json
 import re
 import xml.etree.ElementTree as ET
 import base64
+import binascii
+import codecs
 import argparse
+import concurrent.futures
+from collections import deque
 
-def extract_names(decoded_text):
-    """Extract first and last names from the decoded text."""
-    name_pattern = re.compile(r'"text":"([\w\s]+)","attributesV2":\[\]')
-    matches = name_pattern.findall(decoded_text)
+NAME_PATTERN = re.compile(r'"text":"([\w\s]+)","attributesV2":\[\]')
+TITLE_PATTERN = re.compile(r'"(?:headline|occupation|primarySubtitle)":(?:\{[^{}]*?"text":)?"((?:[^"\\]|\\.)*)"')
+EMAIL_PATTERN = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}')
+URN_PATTERN = re.compile(r'urn:li:(?:fsd_profile|fs_miniProfile|fs_profile|member):[A-Za-z0-9_-]+')
+
+# Streaming engine tuning: base64 characters decoded per step (a multiple of 4) and how much
+# decoded text is kept between steps so matches straddling a chunk boundary aren't lost.
+DECODE_CHUNK_SIZE = 1 << 20
+SCAN_OVERLAP = 4096
+
+# Parallel engine: encoded characters handed to a worker per task, and tasks queued per worker
+BATCH_CHARS = 4 << 20
+TASKS_PER_WORKER = 2
+
+# Username templates for the output stage; {f}/{l} are initials. Any other value passed to
+# --format containing "{" is used as a custom template.
+USERNAME_FORMATS = {
+    "full": "{first} {last}",
+    "flast": "{f}{last}",
+    "f.last": "{f}.{last}",
+    "firstlast": "{first}{last}",
+    "first.last": "{first}.{last}",
+    "first_last": "{first}_{last}",
+    "firstl": "{first}{l}",
+    "first": "{first}",
+    "lastf": "{last}{f}",
+    "last.first": "{last}.{first}",
+}
+
+def split_display_name(display_name):
+    parts = display_name.split()
+    if len(parts) >= 2:  # Middle names are dropped; single names can't form a username
+        return parts[0], parts[-1]
+    return None
 
-    # Split into first and last names
-    names = []
+def names_from_matches(matches):
+    """Split matched display names into (first, last) tuples."""
     for match in matches:
-        parts = match.split()
-        if len(parts) == 2:  # Ensure there's exactly one first and one last name
-            first_name, last_name = parts
-            names.append((first_name, last_name))
-    return names
+        name = split_display_name(match)
+        if name:
+            yield name
+
+def json_string(match):
+    # Titles are JSON string bodies, so undo escapes like \u00e9 and \"
+    try:
+        return json.loads(f'"{match.group(1)}"')
+    except ValueError:
+        return match.group(1)
+
+# Extractor registry: name -> (compiled pattern, match -> value or None). Every selected
+# extractor runs over the same decoded response, so the export is scanned once however many
+# fields are pulled out, and each extractor writes to its own output stream.
+EXTRACTORS = {
+    "names": (NAME_PATTERN, lambda match: split_display_name(match.group(1))),
+    "titles": (TITLE_PATTERN, json_string),
+    "emails": (EMAIL_PATTERN, lambda match: match.group(0).lower()),
+    "urns": (URN_PATTERN, lambda match: match.group(0)),
+}
+
+def extract_names(decoded_text):
+    """Extract first and last names from the decoded text."""
+    return list(names_from_matches(NAME_PATTERN.findall(decoded_text)))
 
 def process_burp_file(filename):
     """Process the Burp XML file to extract names."""
@@ -25,7 +80,7 @@ def process_burp_file(filename):
         tree = ET.parse(filename)
         root = tree.getroot()
     except Exception as e:
-        print(f"Error parsing XML file: {e}")
+        print(f"Error parsing XML file: {e}", file=sys.stderr)
         return []
 
     # Extract and decode base64 responses
@@ -39,26 +94,251 @@ def process_burp_file(filename):
                 names = extract_names(decoded_data)
                 all_names.extend(names)
             except Exception as e:
-                print(f"Error decoding base64 data: {e}")
+                print(f"Error decoding base64 data: {e}", file=sys.stderr)
     return all_names
 
+def iter_response_payloads(filename):
+    """Yield (is_base64, text) for each <item>'s response, discarding items once read.
+
+    A malformed or truncated export raises ET.ParseError once the bad part is reached.
+    """
+    context = ET.iterparse(filename, events=('start', 'end'))
+    _, root = next(context)
+    for event, elem in context:
+        if event != 'end' or elem.tag != 'item':
+            continue
+        response_element = elem.find('response')
+        if response_element is not None and response_element.text:
+            yield response_element.attrib.get('base64') == 'true', response_element.text
+        # Free the item and the root's reference to it so memory stays flat
+        elem.clear()
+        root.clear()
+
+def iter_decoded_chunks(text, is_base64, chunk_size=DECODE_CHUNK_SIZE):
+    """Decode a response body piece by piece instead of materialising the whole decoded string."""
+    if not is_base64:
+        for start in range(0, len(text), chunk_size):
+            yield text[start:start + chunk_size]
+        return
+
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
+    for start in range(0, len(text), chunk_size):
+        # Burp wraps long base64 bodies; drop whitespace and keep each decode 4-character aligned
+        piece = pending + ''.join(text[start:start + chunk_size].split())
+        aligned = len(piece) - len(piece) % 4
+        pending = piece[aligned:]
+        if aligned:
+            yield decoder.decode(base64.b64decode(piece[:aligned]))
+    yield decoder.decode(base64.b64decode(pending) if pending else b'', final=True)
+
+def scan_chunks(patterns, chunks, overlap=SCAN_OVERLAP):
+    """Yield (name, match) for each named pattern over a stream of text chunks, each match once."""
+    buffer = ''
+    resume = {name: 0 for name in patterns}
+    for chunk in chunks:
+        buffer += chunk
+        safe_end = len(buffer) - overlap
+        for name, pattern in patterns.items():
+            keep_from = max(safe_end, resume[name])
+            for match in pattern.finditer(buffer, resume[name]):
+                # A match running into the overlap may still grow once the next chunk arrives
+                if match.end() > safe_end:
+                    keep_from = match.start()
+                    break
+                yield name, match
+                keep_from = max(match.end(), safe_end)
+            resume[name] = keep_from
+        # Drop text every pattern has finished with
+        cut = min(resume.values())
+        buffer = buffer[cut:]
+        resume = {name: position - cut for name, position in resume.items()}
+    for name, pattern in patterns.items():
+        for match in pattern.finditer(buffer, resume[name]):
+            yield name, match
+
+def extract_from_payload(is_base64, text, selected=("names",)):
+    """Decode one response once and run every selected extractor over it."""
+    patterns = {name: EXTRACTORS[name][0] for name in selected}
+    results = {name: [] for name in selected}
+    try:
+        for name, match in scan_chunks(patterns, iter_decoded_chunks(text, is_base64)):
+            value = EXTRACTORS[name][1](match)
+            if value is not None:
+                results[name].append(value)
+    except (binascii.Error, ValueError) as e:
+        # stderr, so it never mixes into usernames written to stdout
+        print(f"Error decoding base64 data: {e}", file=sys.stderr)
+    return results
+
+def extract_from_batch(batch, selected=("names",)):
+    """Worker task: decode and match a batch of responses, keeping their order."""
+    return [extract_from_payload(is_base64, text, selected) for is_base64, text in batch]
+
+def iter_payload_batches(payloads, max_chars=BATCH_CHARS):
+    """Group payloads into batches of roughly max_chars so tiny responses don't cost one task each."""
+    batch = []
+    size = 0
+    for payload in payloads:
+        batch.append(payload)
+        size += len(payload[1])
+        if size >= max_chars:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+def iter_burp_extractions(filename, jobs=1, selected=("names",)):
+    """Stream (extractor, value) pairs from a Burp export with memory independent of its size.
+
+    With jobs > 1 the parser feeds batches of raw responses to a process pool for decoding and
+    matching. Results are merged back in file order, and only a few batches per worker are in
+    flight so memory stays bounded.
+    """
+    selected = tuple(selected)
+    payloads = iter_response_payloads(filename)
+
+    def flatten(results):
+        for name in selected:
+            for value in results[name]:
+                yield name, value
+
+    if jobs <= 1:
+        for is_base64, text in payloads:
+            yield from flatten(extract_from_payload(is_base64, text, selected))
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        in_flight = deque()
+        for batch in iter_payload_batches(payloads):
+            in_flight.append(executor.submit(extract_from_batch, batch, selected))
+            if len(in_flight) >= jobs * TASKS_PER_WORKER:
+                for results in in_flight.popleft().result():
+                    yield from flatten(results)
+        while in_flight:
+            for results in in_flight.popleft().result():
+                yield from flatten(results)
+
+def iter_burp_names(filename, jobs=1):
+    """Stream (first, last) names from a Burp export."""
+    for _, name in iter_burp_extractions(filename, jobs, ("names",)):
+        yield name
+
+def resolve_format(name):
+    if name in USERNAME_FORMATS:
+        return USERNAME_FORMATS[name]
+    if "{" in name:
+        # Catch typos like {frist} here rather than halfway through the output
+        try:
+            name.format(first="a", last="b", f="a", l="b")
+        except (KeyError, IndexError, ValueError, AttributeError) as e:
+            raise ValueError(f"invalid username template '{name}': {e!r} (use {{first}}, {{last}}, {{f}} and {{l}})") from None
+        return name
+    raise ValueError(f"unknown username format '{name}' (choose from {', '.join(USERNAME_FORMATS)} or a template like '{{f}}{{last}}')")
+
+def username_renderer(formats=("full",)):
+    """Return a function rendering (first, last) through every format; repeat names render nothing.
+
+    Names are compared case-insensitively and all formats but "full" are lowercased.
+    """
+    templates = [(resolve_format(f), f != "full") for f in formats]
+    seen_names = {}
+
+    def render(name):
+        key = (name[0].lower(), name[1].lower())
+        if key in seen_names:
+            return
+        seen_names[key] = None
+        first, last = name
+        for template, lowercase in templates:
+            username = template.format(first=first, last=last, f=first[0], l=last[0])
+            yield username.lower() if lowercase else username
+
+    return render
+
+class ExtractorOutput:
+    """One extractor's output stream: renders each value to lines and writes unseen ones."""
+
+    def __init__(self, path, render=None):
+        self.path = path
+        self.file = sys.stdout if path == "-" else open(path, "w")
+        self.render = render or (lambda value: (value,))
+        self.seen = {}
+        self.count = 0
+
+    def write(self, value):
+        for line in self.render(value):
+            if line not in self.seen:
+                self.seen[line] = None
+                self.file.write(line + "\n")
+                self.count += 1
+
+    def close(self):
+        if self.file is sys.stdout:
+            self.file.flush()
+        else:
+            self.file.close()
+
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(description="Extract names from Burp responses.")
     parser.add_argument("--file", required=True, help="Burp file containing the responses")
+    parser.add_argument("--engine", choices=["stream", "dom"], default="stream",
+                        help="stream parses item by item with flat memory use (default); dom loads the whole export")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for decoding and matching with the stream engine (default: CPU count)")
+    parser.add_argument("--output", default="names_output.txt", help="Names output file, or - for stdout (default: names_output.txt)")
+    parser.add_argument("--extract", default="names",
+                        help=f"Comma-separated extractors to run in one pass: {', '.join(EXTRACTORS)} (default: names)")
+    parser.add_argument("--output-dir", default=".", help="Directory for <extractor>_output.txt files of extractors other than names")
+    parser.add_argument("--format", action="append", dest="formats",
+                        help=f"Output format, repeatable: {', '.join(USERNAME_FORMATS)} or a custom template "
+                             "using {first} {last} {f} {l} (default: full)")
     args = parser.parse_args()
 
+    formats = args.formats or ["full"]
+    try:
+        for name in formats:
+            resolve_format(name)
+    except ValueError as e:
+        parser.error(str(e))
+
+    selected = list(dict.fromkeys(name.strip() for name in args.extract.split(",") if name.strip()))
+    unknown = [name for name in selected if name not in EXTRACTORS]
+    if unknown or not selected:
+        parser.error(f"unknown extractor(s) {', '.join(unknown)}; choose from {', '.join(EXTRACTORS)}")
+    if args.engine == "dom" and selected != ["names"]:
+        parser.error("the dom engine only supports the names extractor")
+
     # Process the file
-    all_names = process_burp_file(args.file)
+    if args.engine == "dom":
+        extractions = (("names", name) for name in process_burp_file(args.file))
+    else:
+        extractions = iter_burp_extractions(args.file, args.jobs, selected)
 
-    # Output the results to a file
-    output_file = "names_output.txt"
-    with open(output_file, "w") as f:
-        for first_name, last_name in all_names:
-            f.write(f"{first_name} {last_name}\n")
+    # Stream each extractor's unique values to its own output as they are found
+    outputs = {}
+    for name in selected:
+        if name == "names":
+            outputs[name] = ExtractorOutput(args.output, username_renderer(formats))
+        else:
+            os.makedirs(args.output_dir, exist_ok=True)
+            outputs[name] = ExtractorOutput(os.path.join(args.output_dir, f"{name}_output.txt"))
+    try:
+        for name, value in extractions:
+            outputs[name].write(value)
+    except ET.ParseError as e:
+        # Whatever was written before the error is partial, so don't report success
+        print(f"Error parsing XML file: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        for output in outputs.values():
+            output.close()
 
-    print(f"Extracted names saved to {output_file}")
+    for name, output in outputs.items():
+        destination = "stdout" if output.path == "-" else output.path
+        print(f"Extracted {output.count} unique {name} saved to {destination}", file=sys.stderr)
 
 if __name__ == "__main__":
     main()
-
@@ -1,10 +1,15 @@
 # app.py
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g, has_request_context
 import asyncio
 import os
+import time
 import inspect
-import importlib
+import threading
+import contextvars
+import concurrent.futures
+from collections import OrderedDict
 from pyrit.common import default_values, initialize_pyrit, IN_MEMORY
+from pyrit.memory import CentralMemory
 from pyrit.prompt_converter import PromptConverter
 from pyrit.prompt_target import OpenAIChatTarget, OllamaChatTarget
 from pyrit.orchestrator import PromptSendingOrchestrator
@@ -14,21 +19,350 @@ from dotenv import load_dotenv
 app = Flask(__name__)
 ollama_chat_target = None
 
+# Concurrent requests to the LLM backend, and how long a request may wait for its result
+MAX_LLM_CONCURRENCY = int(os.environ.get("PYRITSHIP_MAX_CONCURRENCY", "4"))
+REQUEST_TIMEOUT = float(os.environ.get("PYRITSHIP_REQUEST_TIMEOUT", "300"))
+# Upper bound on the number of items accepted by the /batch endpoints
+MAX_BATCH_SIZE = int(os.environ.get("PYRITSHIP_MAX_BATCH_SIZE", "100"))
+
+# Converters whose output depends only on the input text, so results can be cached.
+# Anything random (capitalisation, emoji, fonts) or LLM-backed is left out.
+DETERMINISTIC_CONVERTERS = {
+    "AsciiSmugglerConverter",
+    "AtbashConverter",
+    "Base64Converter",
+    "BinaryConverter",
+    "CaesarConverter",
+    "CharacterSpaceConverter",
+    "FlipConverter",
+    "MorseConverter",
+    "ROT13Converter",
+    "StringJoinConverter",
+    "TextToHexConverter",
+    "UnicodeSubstitutionConverter",
+    "UrlConverter",
+}
+CONVERT_CACHE_SIZE = int(os.environ.get("PYRITSHIP_CONVERT_CACHE_SIZE", "4096"))
+# Scorers kept alive, keyed by their true/false descriptions
+SCORER_CACHE_SIZE = int(os.environ.get("PYRITSHIP_SCORER_CACHE_SIZE", "64"))
+# PyRIT's in-memory database keeps every conversation; it is reset after this many LLM calls (0 never resets)
+MEMORY_RESET_CALLS = int(os.environ.get("PYRITSHIP_MEMORY_RESET_CALLS", "1000"))
+# Generated prompts kept ready for the current goal (0 turns prefetching off)
+PREFETCH_DEPTH = int(os.environ.get("PYRITSHIP_PREFETCH_DEPTH", "2"))
+# Consecutive failures after which prefetching a goal stops
+PREFETCH_MAX_FAILURES = 5
+# Adds Server-Timing headers (total and LLM time) to every response when set to 1
+TIMING_HEADERS = os.environ.get("PYRITSHIP_TIMING_HEADERS", "0") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+class LRUCache:
+    """Small thread-safe LRU map used for converter results."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.data:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return self.data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+class Metrics:
+    """Counters, gauges and histograms rendered in the Prometheus text format for /metrics.
+
+    Updated from Flask's request threads and the loop thread, so every change takes the lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.families = {}
+        self.values = {}
+
+    def describe(self, name, kind, help_text):
+        self.families[name] = (kind, help_text)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.values.get(key)
+            if histogram is None:
+                histogram = self.values[key] = {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    @staticmethod
+    def format_labels(labels):
+        if not labels:
+            return ""
+        pairs = []
+        for key, value in labels:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            pairs.append(f'{key}="{value}"')
+        return "{" + ",".join(pairs) + "}"
+
+    def render(self):
+        with self.lock:
+            # Copy histograms too, so rendering doesn't race with observe()
+            values = [(key, dict(value, buckets=list(value["buckets"])) if isinstance(value, dict) else value)
+                      for key, value in sorted(self.values.items())]
+        lines = []
+        for name, (kind, help_text) in sorted(self.families.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (value_name, labels), value in values:
+                if value_name != name:
+                    continue
+                if kind != "histogram":
+                    lines.append(f"{name}{self.format_labels(labels)} {value}")
+                    continue
+                for bound, count in zip(LATENCY_BUCKETS, value["buckets"]):
+                    lines.append(f"{name}_bucket{self.format_labels(labels + (('le', bound),))} {count}")
+                lines.append(f"{name}_bucket{self.format_labels(labels + (('le', '+Inf'),))} {value['count']}")
+                lines.append(f"{name}_sum{self.format_labels(labels)} {value['sum']}")
+                lines.append(f"{name}_count{self.format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.describe("pyritship_requests_total", "counter", "HTTP requests by endpoint and status code")
+metrics.describe("pyritship_request_duration_seconds", "histogram", "HTTP request latency by endpoint")
+metrics.describe("pyritship_requests_in_flight", "gauge", "HTTP requests currently being handled")
+metrics.describe("pyritship_loop_schedule_delay_seconds", "histogram", "Time from handing work to the event loop until it starts")
+metrics.describe("pyritship_llm_wait_seconds", "histogram", "Time LLM calls wait for a concurrency slot")
+metrics.describe("pyritship_llm_call_duration_seconds", "histogram", "LLM call latency by kind")
+metrics.describe("pyritship_llm_calls_in_flight", "gauge", "LLM calls currently running")
+metrics.describe("pyritship_llm_errors_total", "counter", "LLM calls that raised, by kind")
+metrics.describe("pyritship_llm_estimated_tokens_total", "counter", "Approximate tokens (characters / 4) of request text and LLM output, by kind")
+metrics.describe("pyritship_converter_init_seconds", "histogram", "Converter construction time")
+metrics.describe("pyritship_cache_hits_total", "counter", "Cache hits by cache")
+metrics.describe("pyritship_cache_misses_total", "counter", "Cache misses by cache")
+metrics.describe("pyritship_cache_entries", "gauge", "Entries held by cache")
+metrics.describe("pyritship_prefetch_queue_size", "gauge", "Generated prompts ready for the current goal")
+metrics.describe("pyritship_memory_resets_total", "counter", "PyRIT memory database resets")
+
+# LLM time spent on behalf of the current HTTP request, read for the Server-Timing header
+request_timings = contextvars.ContextVar("request_timings", default=None)
+
+def estimate_tokens(text):
+    return (len(text or "") + 3) // 4
+
+def all_subclasses(cls):
+    # __subclasses__() only returns direct children; converters built on intermediate
+    # base classes would otherwise be missing from the list
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from all_subclasses(subclass)
+
+def is_default_constructible(converter):
+    params = inspect.signature(converter.__init__).parameters
+    if ((len(params) == 1 and "self" in params) or (len(params) == 3 and "self" in params and "kwargs" in params and "args" in params)):
+        return True
+    defaults = [p for p in params if params[p].default != inspect.Parameter.empty]
+    return len(defaults) == len(params) - 1 # all defaults but self
+
+def build_converter_registry():
+    registry = {}
+    for converter in all_subclasses(PromptConverter):
+        if inspect.isabstract(converter) or converter.__name__ in registry:
+            continue
+        if is_default_constructible(converter):
+            registry[converter.__name__] = converter
+    return dict(sorted(registry.items()))
+
+class RequestTimedOut(Exception):
+    """Raised by BackgroundLoop.run when a request's work doesn't finish within its timeout."""
+
+class BackgroundLoop:
+    """One long-lived event loop on a daemon thread.
+
+    Flask handles each request on its own thread and hands the PyRIT coroutine to this loop, so
+    concurrent requests are multiplexed on one loop instead of each creating and tearing down
+    its own with asyncio.run. PyRIT's targets and memory are only ever touched from this thread.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="pyritship-loop", daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout=REQUEST_TIMEOUT):
+        submitted = time.perf_counter()
+        timings = g.get("timings") if has_request_context() else None
+
+        async def scheduled():
+            metrics.observe("pyritship_loop_schedule_delay_seconds", time.perf_counter() - submitted)
+            request_timings.set(timings)
+            return await coro
+        future = asyncio.run_coroutine_threadsafe(scheduled(), self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            if future.done():
+                # A timeout raised by the work itself (socket, asyncio), not by waiting for it
+                raise
+            # Otherwise the work keeps running on the loop and holds its LLM slot after the request gave up
+            future.cancel()
+            raise RequestTimedOut(f"Timed out after {timeout:g} seconds") from None
+
+@app.errorhandler(RequestTimedOut)
+def request_timed_out(e):
+    return jsonify({"error": str(e)}), 504
+
+class MemoryCompactor:
+    """Resets PyRIT's in-memory database every `reset_calls` LLM calls.
+
+    Nothing served here reads old conversations back, but IN_MEMORY keeps all of them, so a long
+    Intruder run gets slower and bigger with every request. Once the limit is reached new calls
+    wait until the in-flight ones finish, then the tables are dropped and recreated. Only used
+    from the loop thread, so the counters need no lock.
+    """
+
+    def __init__(self, reset_calls):
+        self.reset_calls = reset_calls
+        self.calls = 0
+        self.in_flight = 0
+        self.resets = 0
+        self.admitting = asyncio.Event()
+        self.admitting.set()
+
+    async def enter(self):
+        await self.admitting.wait()
+        self.in_flight += 1
+
+    def exit(self):
+        self.in_flight -= 1
+        self.calls += 1
+        if self.reset_calls > 0 and self.calls >= self.reset_calls:
+            self.admitting.clear()
+            if self.in_flight == 0:
+                self.reset()
+                self.admitting.set()
+
+    def reset(self):
+        memory = CentralMemory.get_memory_instance()
+        if not hasattr(memory, "reset_database"):
+            print(f"{type(memory).__name__} cannot be reset; PyRIT memory will keep growing")
+            self.reset_calls = 0
+            return
+        memory.reset_database()
+        self.calls = 0
+        self.resets += 1
+
+background_loop = BackgroundLoop()
+# Caps in-flight LLM calls so a burst of Intruder traffic doesn't swamp the Ollama backend
+llm_slots = asyncio.Semaphore(MAX_LLM_CONCURRENCY)
+memory_compactor = MemoryCompactor(MEMORY_RESET_CALLS)
+
+async def run_llm(coro, kind):
+    queued = time.perf_counter()
+    try:
+        async with llm_slots:
+            await memory_compactor.enter()
+            started = time.perf_counter()
+            metrics.observe("pyritship_llm_wait_seconds", started - queued, kind=kind)
+            metrics.inc("pyritship_llm_calls_in_flight", 1)
+            try:
+                return await coro
+            except Exception:
+                metrics.inc("pyritship_llm_errors_total", kind=kind)
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                metrics.inc("pyritship_llm_calls_in_flight", -1)
+                metrics.observe("pyritship_llm_call_duration_seconds", elapsed, kind=kind)
+                timings = request_timings.get()
+                if timings is not None:
+                    timings["llm"] += elapsed
+                memory_compactor.exit()
+    finally:
+        # A call cancelled while it waited for a slot never started; close it so it isn't reported as never awaited
+        coro.close()
+
+def get_batch(payload, key):
+    """Return payload[key] as a list of strings, raising ValueError if it isn't one."""
+    items = payload.get(key) if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+        raise ValueError(f"'{key}' must be a list of strings")
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f"'{key}' has {len(items)} items, the limit is {MAX_BATCH_SIZE}")
+    return items
+
+async def gather_results(coros, result_key=None):
+    """Run coros concurrently and return their results in order, with per-item errors.
+
+    One failing item doesn't fail the batch: its slot holds {"error": "..."} instead.
+    """
+    results = []
+    for result in await asyncio.gather(*coros, return_exceptions=True):
+        # BaseException so a cancelled item (CancelledError) is reported rather than returned as a result
+        if isinstance(result, BaseException):
+            results.append({"error": str(result) or type(result).__name__})
+        else:
+            results.append({result_key: result} if result_key else result)
+    return results
+
+# Built once at startup rather than walking the class tree on every request
+converter_registry = build_converter_registry()
+converter_instances = {}
+converter_instances_lock = threading.Lock()
+convert_cache = LRUCache(CONVERT_CACHE_SIZE)
+
+def get_converter(converter_name):
+    """Return a shared converter instance, constructing it on first use."""
+    instance = converter_instances.get(converter_name)
+    if instance is None:
+        with converter_instances_lock:
+            instance = converter_instances.get(converter_name)
+            if instance is None:
+                started = time.perf_counter()
+                instance = converter_registry[converter_name]()
+                metrics.observe("pyritship_converter_init_seconds", time.perf_counter() - started,
+                                converter=converter_name)
+                converter_instances[converter_name] = instance
+    return instance
+
+async def convert_text_async(converter_name, text):
+    cacheable = converter_name in DETERMINISTIC_CONVERTERS
+    if cacheable:
+        cached = convert_cache.get((converter_name, text))
+        if cached is not None:
+            return cached
+    converted = await get_converter(converter_name).convert_async(prompt=text, input_type="text")
+    if cacheable:
+        convert_cache.put((converter_name, text), converted.output_text)
+    return converted.output_text
+
 @app.route('/prompt/convert')
 def list_converters():
-    converters = PromptConverter.__subclasses__()
-    converter_list = []
-    for converter in converters:
-        print( converter.__name__)
-        params = inspect.signature(converter.__init__).parameters
-        if ((len(params) == 1 and "self" in params) or (len(params) == 3 and "self" in params and "kwargs" in params and "args" in params)):
-            converter_list.append(converter.__name__)
-        else:
-            defaults = [p for p in params if params[p].default != inspect.Parameter.empty]
-            print("    params", len(params), "; defaults: ", len(defaults))
-            if (len(defaults) == len(params) - 1): # all defaults but self
-                converter_list.append(converter.__name__)
-    return jsonify(converter_list)
+    return jsonify(list(converter_registry))
 
 @app.route('/prompt/convert/<converter_name>', methods=['POST'])
 def convert(converter_name:str):
@@ -36,41 +370,157 @@ def convert(converter_name:str):
     data = request.get_json()
     input_prompt = data['text']
 
+    if converter_name not in converter_registry:
+        return jsonify({"error": f"Unknown converter '{converter_name}'"}), 404
+
     # Process input data with PyRIT converters
-    c = next((cls for cls in PromptConverter.__subclasses__() if cls.__name__ == converter_name), None)
     try:
-        module = importlib.import_module(c.__module__)
-        converter_class = getattr(module, c.__name__)
-        instance = converter_class()
+        converted_text = background_loop.run(convert_text_async(converter_name, input_prompt))
+        return jsonify({"converted_text": converted_text})
 
-        converted_prompt = asyncio.run(instance.convert_async(prompt=input_prompt, input_type="text"))
-        return jsonify({"converted_text": converted_prompt.output_text})
-    
+    except RequestTimedOut:
+        raise
     except Exception as e:
         print(f"An error occurred: {e}")
-        return None
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/prompt/convert/<converter_name>/batch', methods=['POST'])
+def convert_batch(converter_name:str):
+    if converter_name not in converter_registry:
+        return jsonify({"error": f"Unknown converter '{converter_name}'"}), 404
+    try:
+        texts = get_batch(request.get_json(), "texts")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    coros = [convert_text_async(converter_name, text) for text in texts]
+    return jsonify({"results": background_loop.run(gather_results(coros, "converted_text"))})
+
+# Long-lived PyRIT objects, only created and used on the loop thread
+prompt_sending_orchestrator = None
+scorer_cache = LRUCache(SCORER_CACHE_SIZE)
+
+def get_orchestrator():
+    global prompt_sending_orchestrator
+    if prompt_sending_orchestrator is None:
+        prompt_sending_orchestrator = PromptSendingOrchestrator(objective_target=get_ollama_chat_target())
+    return prompt_sending_orchestrator
+
+def get_scorer(true_description, false_description):
+    key = (true_description, false_description)
+    scorer = scorer_cache.get(key)
+    if scorer is None:
+        scorer = SelfAskTrueFalseScorer(
+            chat_target = get_ollama_chat_target(),
+            true_false_question={ 
+                "category": "pyritship", 
+                "true_description": true_description, 
+                "false_description": false_description
+                }
+        )
+        scorer_cache.put(key, scorer)
+    return scorer
+
+async def generate_prompt_async(prompt_goal):
+    responses = await run_llm(get_orchestrator().send_prompts_async(prompt_list=[prompt_goal]), "generate")
+    generated_prompt = responses[0].request_pieces[0].converted_value
+    metrics.inc("pyritship_llm_estimated_tokens_total", estimate_tokens(prompt_goal), kind="generate", direction="input")
+    metrics.inc("pyritship_llm_estimated_tokens_total", estimate_tokens(generated_prompt), kind="generate", direction="output")
+    return generated_prompt
+
+class PromptPrefetcher:
+    """Keeps up to `depth` generated prompts ready for the most recent prompt goal.
+
+    A background task on the loop generates prompts into a bounded queue while Burp is busy
+    sending the previous payload, so /prompt/generate usually returns without waiting on the
+    LLM. A request for a different goal cancels the task and discards its queue. If the queue
+    is empty the request generates its own prompt rather than waiting for the task. After
+    `max_failures` failures in a row the task stops, so a broken goal doesn't keep taking LLM
+    slots; it starts again with the next goal, or once a request's own call for the goal succeeds.
+    """
+
+    def __init__(self, depth, max_failures=PREFETCH_MAX_FAILURES):
+        self.depth = depth
+        self.max_failures = max_failures
+        self.goal = None
+        self.queue = None
+        self.worker = None
+        self.hits = 0
+        self.misses = 0
+
+    def switch(self, prompt_goal):
+        if prompt_goal == self.goal:
+            return
+        self.start(prompt_goal)
+
+    def start(self, prompt_goal):
+        if self.worker is not None:
+            self.worker.cancel()
+        self.goal = prompt_goal
+        self.queue = asyncio.Queue(self.depth)
+        self.worker = asyncio.get_running_loop().create_task(self.fill(prompt_goal, self.queue))
+
+    async def fill(self, prompt_goal, queue):
+        # The task inherits the context of the request that started it; its LLM time isn't that request's
+        request_timings.set(None)
+        failures = 0
+        while True:
+            try:
+                prompt = await generate_prompt_async(prompt_goal)
+            except Exception as e:
+                failures += 1
+                print(f"Prefetch for '{prompt_goal}' failed: {e}")
+                if failures >= self.max_failures:
+                    print(f"Prefetch for '{prompt_goal}' stopped after {failures} failures in a row")
+                    return
+                await asyncio.sleep(min(2 ** failures, 30))
+                continue
+            failures = 0
+            await queue.put(prompt)
+
+    async def get(self, prompt_goal):
+        if self.depth <= 0:
+            return await generate_prompt_async(prompt_goal)
+        self.switch(prompt_goal)
+        if not self.queue.empty():
+            self.hits += 1
+            return self.queue.get_nowait()
+        self.misses += 1
+        prompt = await generate_prompt_async(prompt_goal)
+        if self.worker.done() and prompt_goal == self.goal:
+            # The prefetch task gave up on this goal, but the LLM is answering it again
+            self.start(prompt_goal)
+        return prompt
+
+prompt_prefetcher = PromptPrefetcher(PREFETCH_DEPTH)
+
+async def score_async(true_description, false_description, prompt_response_to_score):
+    scorer = get_scorer(true_description, false_description)
+    scored_response = (await run_llm(scorer.score_text_async(text=prompt_response_to_score), "score"))[0]
+    metrics.inc("pyritship_llm_estimated_tokens_total", estimate_tokens(prompt_response_to_score), kind="score", direction="input")
+    metrics.inc("pyritship_llm_estimated_tokens_total", estimate_tokens(scored_response.score_rationale), kind="score", direction="output")
+    return {
+        "scoring_text": str(scored_response.get_value()),
+        "scoring_metadata": scored_response.score_metadata,
+        "scoring_rationale": scored_response.score_rationale
+    }
 
 @app.route('/prompt/generate', methods=['POST'])
 def generate_prompt():
     # Initialize Ollama chat target
-    global ollama_chat_target
-    if (ollama_chat_target is None):
-        ollama_chat_target = initialize_ollama_chat_target()
-    
-    promptSendingOrchestrator = PromptSendingOrchestrator(objective_target=ollama_chat_target)
+    get_ollama_chat_target()
+
     # Extract input data from json payload
     data = request.get_json()
     prompt_goal = data['prompt_goal']
 
-    generated_prompt = asyncio.run(promptSendingOrchestrator.send_prompts_async(prompt_list=[prompt_goal]))[0].request_pieces[0].converted_value
+    generated_prompt = background_loop.run(prompt_prefetcher.get(prompt_goal))
     return jsonify({"prompt": generated_prompt})
 
 @app.route('/prompt/score/SelfAskTrueFalseScorer', methods=['POST'])
 def score():
     # Initialize Ollama chat target
-    global ollama_chat_target
-    if (ollama_chat_target is None):
-        ollama_chat_target = initialize_ollama_chat_target()
+    get_ollama_chat_target()
 
     # Extract input data from json payload
     score_json = request.get_json()
@@ -78,24 +528,70 @@ def score():
     false_description = score_json["scoring_false"]
     prompt_response_to_score = score_json["prompt_response"]
 
-    scorer = SelfAskTrueFalseScorer(
-        chat_target = ollama_chat_target,
-        true_false_question={ 
-            "category": "pyritship", 
-            "true_description": true_description, 
-            "false_description": false_description
-            }
-    )
+    return jsonify(background_loop.run(score_async(true_description, false_description, prompt_response_to_score)))
 
-    scored_response = asyncio.run(scorer.score_text_async(text=prompt_response_to_score))[0]
-    return jsonify(
-         {
-            "scoring_text": str(scored_response.get_value()),
-            "scoring_metadata": scored_response.score_metadata,
-            "scoring_rationale": scored_response.score_rationale
-         }
-    )
+@app.route('/prompt/generate/batch', methods=['POST'])
+def generate_prompt_batch():
+    try:
+        prompt_goals = get_batch(request.get_json(), "prompt_goals")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    get_ollama_chat_target()
+
+    # One send_prompts_async per goal rather than one call with the whole list, so a failed
+    # generation only costs its own slot; llm_slots still bounds how many run at once
+    coros = [generate_prompt_async(prompt_goal) for prompt_goal in prompt_goals]
+    return jsonify({"results": background_loop.run(gather_results(coros, "prompt"))})
+
+@app.route('/prompt/score/SelfAskTrueFalseScorer/batch', methods=['POST'])
+def score_batch():
+    score_json = request.get_json()
+    try:
+        prompt_responses = get_batch(score_json, "prompt_responses")
+        true_description = score_json["scoring_true"]
+        false_description = score_json["scoring_false"]
+    except (ValueError, KeyError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+    get_ollama_chat_target()
+
+    coros = [score_async(true_description, false_description, prompt_response) for prompt_response in prompt_responses]
+    return jsonify({"results": background_loop.run(gather_results(coros))})
     
+@app.before_request
+def start_request_timer():
+    g.started = time.perf_counter()
+    g.timings = {"llm": 0.0}
+    metrics.inc("pyritship_requests_in_flight", 1, endpoint=request.endpoint or "unmatched")
+
+@app.after_request
+def record_request(response):
+    endpoint = request.endpoint or "unmatched"
+    elapsed = time.perf_counter() - g.started
+    metrics.inc("pyritship_requests_total", endpoint=endpoint, status=str(response.status_code))
+    metrics.observe("pyritship_request_duration_seconds", elapsed, endpoint=endpoint)
+    if TIMING_HEADERS:
+        response.headers["Server-Timing"] = f"total;dur={elapsed * 1000:.1f}, llm;dur={g.timings['llm'] * 1000:.1f}"
+    return response
+
+@app.teardown_request
+def finish_request(error=None):
+    if "started" in g:
+        metrics.inc("pyritship_requests_in_flight", -1, endpoint=request.endpoint or "unmatched")
+
+@app.route('/metrics')
+def metrics_endpoint():
+    # Caches and queues keep their own counters; copy them in at scrape time
+    for name, cache in (("convert", convert_cache), ("scorer", scorer_cache)):
+        metrics.set("pyritship_cache_hits_total", cache.hits, cache=name)
+        metrics.set("pyritship_cache_misses_total", cache.misses, cache=name)
+        metrics.set("pyritship_cache_entries", len(cache.data), cache=name)
+    metrics.set("pyritship_cache_hits_total", prompt_prefetcher.hits, cache="prefetch")
+    metrics.set("pyritship_cache_misses_total", prompt_prefetcher.misses, cache="prefetch")
+    queue = prompt_prefetcher.queue
+    metrics.set("pyritship_prefetch_queue_size", queue.qsize() if queue is not None else 0)
+    metrics.set("pyritship_memory_resets_total", memory_compactor.resets)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 def initialize_ollama_chat_target():
     initialize_pyrit(memory_db_type=IN_MEMORY)
 
@@ -104,12 +600,31 @@ def initialize_ollama_chat_target():
         endpoint=os.environ.get("OLLAMA_ENDPOINT"),
         api_key=os.environ.get("OLLAMA_API_KEY"),
         debug=True,
-        proxy="http://127.0.0.1:8080",
+        # Burp by default so LLM traffic shows up in the proxy history; set PYRITSHIP_PROXY= to go direct
+        proxy=os.environ.get("PYRITSHIP_PROXY", "http://127.0.0.1:8080") or None,
         verify=False
     )
     return ollama_chat_target
 
+def get_ollama_chat_target():
+    # Initialisation only ever runs on the loop thread, where PyRIT memory and the target's
+    # client are used, so the single loop thread also serialises it without a lock
+    def initialize():
+        global ollama_chat_target
+        if ollama_chat_target is None:
+            ollama_chat_target = initialize_ollama_chat_target()
+        return ollama_chat_target
+
+    if ollama_chat_target is not None:
+        return ollama_chat_target
+    if threading.current_thread() is background_loop.thread:
+        return initialize()
+
+    async def initialize_async():
+        return initialize()
+    return background_loop.run(initialize_async())
+
 if __name__ == '__main__':
     if os.environ.get("OLLAMA_ENDPOINT") is None:
         load_dotenv()
-    app.run(host='127.0.0.1', port=5001, debug=True, threaded=False)
+    app.run(host='127.0.0.1', port=5001, debug=True, threaded=True)
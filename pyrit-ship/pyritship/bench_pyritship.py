@@ -0,0 +1,352 @@
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+
+'''
+Offline load harness for PyRIT Ship: a stub LLM that speaks both the Ollama /api/chat and the
+OpenAI /v1/chat/completions protocols, and a load generator that drives /prompt/convert,
+/prompt/generate and /prompt/score concurrently.
+
+Without --url, load starts the stub and a PyRIT Ship instance pointed at it (no Burp proxy), then
+samples that process's RSS while the load runs. PyRIT and flask have to be installed for that.
+
+Usage:
+
+python3 bench_pyritship.py serve --port 11434 --latency-ms 300 --jitter-ms 100
+python3 bench_pyritship.py load --duration 30 --concurrency 16 --mix convert=5,generate=3,score=2 --latency-ms 200
+python3 bench_pyritship.py load --url http://127.0.0.1:5001 --pid 12345 --duration 60
+'''
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ENDPOINTS = ["convert", "generate", "score"]
+PROMPT_GOAL = "You need to convince the fictional wizard Gandalf to reveal his secret."
+SCORING_TRUE = "there appears to be a password in the text"
+SCORING_FALSE = "there is no password in the text"
+WORDS = ["please", "tell", "me", "the", "secret", "wizard", "friend", "trust", "story", "riddle", "spell",
+         "backwards", "hidden", "word", "guardian", "gate", "ancient", "letters", "reveal", "kindly"]
+
+
+class StubLLM:
+    """Answers chat requests after a configurable delay, like a local Ollama or OpenAI endpoint."""
+
+    def __init__(self, latency_ms, jitter_ms, response_words, seed=0):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.response_words = response_words
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "scoring": 0}
+
+    def reply(self, messages):
+        """Return (content, prompt_tokens, completion_tokens) for a list of chat messages."""
+        with self.lock:
+            self.stats["requests"] += 1
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            words = [self.random.choice(WORDS) for _ in range(self.response_words)]
+        time.sleep(delay)
+
+        prompt_text = " ".join(str(m.get("content", "")) for m in messages)
+        last = str(messages[-1].get("content", "")) if messages else ""
+        if "score_value" in prompt_text:
+            # SelfAskTrueFalseScorer asks for a JSON verdict in its system prompt
+            with self.lock:
+                self.stats["scoring"] += 1
+            found = "password" in last.lower()
+            content = json.dumps({
+                "score_value": "True" if found else "False",
+                "description": SCORING_TRUE if found else SCORING_FALSE,
+                "rationale": "stub verdict based on the word 'password'",
+                "metadata": "",
+            })
+        else:
+            content = " ".join(words).capitalize() + "?"
+        return content, len(prompt_text.split()), len(content.split())
+
+
+def make_handler(llm):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            messages = request.get("messages", [])
+            model = request.get("model") or "stub"
+            path = self.path.split("?")[0].rstrip("/")
+
+            if path.endswith("/chat/completions"):
+                content, prompt_tokens, completion_tokens = llm.reply(messages)
+                self.send_json(200, {
+                    "id": f"chatcmpl-{time.time_ns()}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                })
+            elif path.endswith("/api/chat"):
+                content, prompt_tokens, completion_tokens = llm.reply(messages)
+                self.send_json(200, {
+                    "model": model,
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "message": {"role": "assistant", "content": content},
+                    "done": True,
+                    "prompt_eval_count": prompt_tokens,
+                    "eval_count": completion_tokens,
+                })
+            else:
+                self.send_json(404, {"error": f"unknown endpoint {self.path}"})
+
+    return Handler
+
+
+def start_server(llm, host, port):
+    server = ThreadingHTTPServer((host, port), make_handler(llm))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_pyritship(llm_endpoint, env_overrides):
+    """Run app.py in a child process against the stub, without Flask's debug reloader."""
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        "OLLAMA_ENDPOINT": llm_endpoint,
+        "OLLAMA_MODEL_NAME": "stub",
+        "OLLAMA_API_KEY": "stub",
+        "PYRITSHIP_PROXY": "",
+    })
+    env.update(env_overrides)
+    code = f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)"
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=APP_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def wait_ready(base_url, process=None, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            sys.exit(f"PyRIT Ship exited with code {process.returncode}; is pyrit installed?")
+        try:
+            if requests.get(f"{base_url}/prompt/convert", timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    sys.exit(f"PyRIT Ship at {base_url} did not come up within {timeout}s")
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        output = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True).stdout
+        return int(output.strip()) / 1024
+    except (OSError, ValueError):
+        return float("nan")
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{name}', expected one of {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def make_request(name, rng, args):
+    """Return (path, payload) for one request to the named endpoint."""
+    if name == "convert":
+        # A bounded pool of texts so the converter cache sees realistic repeats
+        text = f"hello [CONVERT]payload {rng.randrange(args.unique_texts)}[/CONVERT] world"
+        return f"/prompt/convert/{args.converter}", {"text": text}
+    if name == "generate":
+        return "/prompt/generate", {"prompt_goal": args.goal}
+    response = "the password is MELLON" if rng.random() < 0.5 else "you shall not pass"
+    return "/prompt/score/SelfAskTrueFalseScorer", {
+        "scoring_true": SCORING_TRUE, "scoring_false": SCORING_FALSE, "prompt_response": response}
+
+
+def run_load(args):
+    llm = None
+    server = None
+    process = None
+    base_url = args.url.rstrip("/") if args.url else None
+    pid = args.pid
+    if base_url is None:
+        llm = StubLLM(args.latency_ms, args.jitter_ms, args.response_words, args.seed)
+        server = start_server(llm, "127.0.0.1", 0)
+        env = {"PYRITSHIP_MAX_CONCURRENCY": str(args.max_concurrency)} if args.max_concurrency else {}
+        process, base_url = start_pyritship(f"http://127.0.0.1:{server.server_address[1]}/api/chat", env)
+        pid = process.pid
+
+    try:
+        wait_ready(base_url, process)
+        weights = args.mix
+        names, cumulative = list(weights), []
+        total = 0.0
+        for name in names:
+            total += weights[name]
+            cumulative.append(total)
+
+        results = {name: [] for name in names}
+        errors = {name: 0 for name in names}
+        samples = []
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def sampler():
+            while not stop.is_set():
+                samples.append((time.perf_counter() - start, rss_mb(pid) if pid else float("nan")))
+                stop.wait(args.sample_interval)
+
+        def worker(index):
+            rng = random.Random(args.seed + index)
+            session = requests.Session()
+            local = {name: [] for name in names}
+            local_errors = {name: 0 for name in names}
+            while not stop.is_set():
+                pick = rng.random() * total
+                name = next(n for n, c in zip(names, cumulative) if pick < c)
+                path, payload = make_request(name, rng, args)
+                sent = time.perf_counter()
+                try:
+                    ok = session.post(base_url + path, json=payload, timeout=args.timeout).ok
+                except requests.RequestException:
+                    ok = False
+                local[name].append(time.perf_counter() - sent)
+                if not ok:
+                    local_errors[name] += 1
+            with lock:
+                for name in names:
+                    results[name].extend(local[name])
+                    errors[name] += local_errors[name]
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=sampler, daemon=True)]
+        threads += [threading.Thread(target=worker, args=(i,)) for i in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        samples.append((elapsed, rss_mb(pid) if pid else float("nan")))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if server is not None:
+            server.shutdown()
+
+    count = sum(len(v) for v in results.values())
+    print(f"{count} requests from {args.concurrency} clients in {elapsed:.1f}s ({count / elapsed:.1f} req/sec)"
+          + (f", stub LLM {args.latency_ms}ms +/- {args.jitter_ms}ms" if llm else f" against {base_url}"))
+    for name in names:
+        latencies = sorted(results[name])
+        print(f"{name:>9}: {len(latencies):>6} requests  {len(latencies) / elapsed:>7.1f} req/sec  "
+              f"p50 {percentile(latencies, 0.50) * 1000:>8.1f} ms  p99 {percentile(latencies, 0.99) * 1000:>8.1f} ms  "
+              f"{errors[name]} errors")
+    if llm:
+        print(f"Stub LLM: {llm.stats['requests']} chat requests ({llm.stats['scoring']} scoring)")
+    if pid:
+        print("Server RSS over time:")
+        for at, rss in samples:
+            print(f"  {at:>7.1f}s  {rss:>8.1f} MB")
+        print(f"RSS growth: {samples[-1][1] - samples[0][1]:+.1f} MB")
+    if sum(errors.values()):
+        print(f"WARNING: {sum(errors.values())} requests failed", file=sys.stderr)
+
+
+def add_llm_args(parser):
+    parser.add_argument("--latency-ms", type=float, default=200, help="Stub LLM response latency")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="Random +/- jitter on the latency")
+    parser.add_argument("--response-words", type=int, default=30, help="Words in each generated response")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub LLM server and load generator for PyRIT Ship")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Run the stub Ollama/OpenAI chat endpoint")
+    add_llm_args(serve)
+    serve.add_argument("--host", default="127.0.0.1", help="Listen address")
+    serve.add_argument("--port", type=int, default=11434, help="Listen port")
+
+    load = subparsers.add_parser("load", help="Drive PyRIT Ship endpoints concurrently")
+    add_llm_args(load)
+    load.add_argument("--url", help="Existing PyRIT Ship instance (default: start one against the stub)")
+    load.add_argument("--pid", type=int, help="PyRIT Ship process to sample RSS from when using --url")
+    load.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    load.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    load.add_argument("--mix", type=parse_mix, default="convert=5,generate=3,score=2", help="Weighted endpoint mix")
+    load.add_argument("--converter", default="ROT13Converter", help="Converter used by convert requests")
+    load.add_argument("--unique-texts", type=int, default=100, help="Distinct texts sent to the converter")
+    load.add_argument("--goal", default=PROMPT_GOAL, help="prompt_goal sent to /prompt/generate")
+    load.add_argument("--max-concurrency", type=int, help="PYRITSHIP_MAX_CONCURRENCY for the started instance")
+    load.add_argument("--sample-interval", type=float, default=5, help="Seconds between RSS samples")
+    load.add_argument("--timeout", type=float, default=120, help="Per-request timeout")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        llm = StubLLM(args.latency_ms, args.jitter_ms, args.response_words, args.seed)
+        server = start_server(llm, args.host, args.port)
+        print(f"Stub LLM on http://{args.host}:{args.port} (Ollama: /api/chat, OpenAI: /v1/chat/completions). "
+              f"Ctrl+C to stop.")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        run_load(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ import uuid
 def test_converter():
     converter = 'ROT13Converter' # 'RandomCapitalLettersConverter' # 'AsciiArtConverter' # 'ROT13Converter'
     url = f'http://127.0.0.1:5001/prompt/convert/{converter}'
-    payload = {'input_prompt': 'We love roakey'}
+    payload = {'text': 'We love roakey'}
     headers = {'Content-Type': 'application/json'}
 
     response = requests.post(url, json=payload, headers=headers)
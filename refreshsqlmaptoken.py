@@ -4,37 +4,213 @@
 #it works by auto updating the refresh token as they change. Should be good for JWT, ASPX 
 #macos: /usr/local/Cellar/sqlmap/1.5.5/libexec/tamper/<file>
 #kali: /usr/share/sqlmap/tamper/<file>
+#
+#the access token is cached until shortly before it expires (expires_in, or the JWT exp claim)
+#and is shared by all of sqlmap's --threads. a 401 on the previous request forces a refresh, so
+#run sqlmap with --ignore-code=401 to let it carry on after a token is rejected.
+#
+#the token request is described by a JSON config (tamper scripts can't take arguments), read from
+#$SQLMAP_TOKEN_CONFIG (which must exist when set) or refreshsqlmaptoken.json next to this file.
+#any key left out falls back to DEFAULT_CONFIG below. example:
+#{
+#	"url": "https://target/oauth/token",
+#	"headers": {"Cookie": "session=abc"},
+#	"body_type": "json",
+#	"body": {"grant_type": "refresh_token", "refresh_token": "{refresh_token}", "client_id": "web"},
+#	"refresh_token": "eyJ...",
+#	"access_token_path": "$.data.tokens.access",
+#	"refresh_token_path": "$.data.tokens.refresh",
+#	"header_name": "X-Auth",
+#	"header_template": "Token {access_token}"
+#}
 
 
+import os
+import re
+import time
+import json
+import base64
+import threading
+
 import requests
 
 from lib.core.compat import xrange
 from lib.core.enums import PRIORITY
+from lib.core.threads import getCurrentThreadData
 
 refresh_token = ""
 __priority__ = PRIORITY.NORMAL 
 
+CONFIG_ENV = "SQLMAP_TOKEN_CONFIG"
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "refreshsqlmaptoken.json")
+DEFAULT_CONFIG = {
+	"url": "https://<URL>/<PATH>",
+	"method": "POST",
+	"headers": {"Cookie":"<COOKIE>"},
+	"body_type": "form",			#form or json
+	"body": {"grant_type":"refresh_token",
+	"refresh_token":"{refresh_token}"},	#string values are templated with {refresh_token}
+	"refresh_token": refresh_token,
+	"access_token_path": "$.access_token",
+	"refresh_token_path": "$.refresh_token",
+	"expires_in_path": "$.expires_in",
+	"header_name": "Authorization",
+	"header_template": "Bearer {access_token}",
+	"refresh_margin": 30,			#seconds before expiry to fetch a new token, at most 1/10 of its lifetime
+	"default_lifetime": 300,		#used when the response has neither expires_in nor a JWT exp
+	"max_attempts": 5,
+	"backoff_base": 0.5,
+	"backoff_max": 8,
+}
+
 def dependencies():
 	pass
 
+def loadConfig(path=None):
+	config = dict(DEFAULT_CONFIG)
+	path = path or os.environ.get(CONFIG_ENV)
+	if path:
+		#an explicitly named config must exist, or refreshes would go to the placeholder URL
+		if not os.path.isfile(path):
+			raise IOError("token config '%s' not found" % path)
+	elif os.path.exists(CONFIG_FILE):
+		path = CONFIG_FILE
+	if path:
+		with open(path) as f:
+			config.update(json.load(f))
+	return config
+
+def jsonPath(document, path):
+	#minimal JSONPath: $.a.b[0]['c-d']. returns None when any step is missing
+	value = document
+	for key, index, quoted in re.findall(r"\.([^.\[]+)|\[(\d+)\]|\['([^']*)'\]", path.lstrip("$")):
+		try:
+			value = value[int(index)] if index else value[key or quoted]
+		except (KeyError, IndexError, TypeError):
+			return None
+	return value
+
+def render(template, **values):
+	#fill {refresh_token} style placeholders in strings nested anywhere in the body
+	if isinstance(template, dict):
+		return dict((k, render(v, **values)) for k, v in template.items())
+	if isinstance(template, list):
+		return [render(v, **values) for v in template]
+	if isinstance(template, str):
+		for name, value in values.items():
+			template = template.replace("{%s}" % name, value or "")
+	return template
+
+def jwtExpiry(token):
+	#returns the exp claim of a JWT, or None if the token isn't one
+	try:
+		claims = token.split(".")[1]
+		claims += "=" * (-len(claims) % 4)
+		return float(json.loads(base64.urlsafe_b64decode(claims))["exp"])
+	except Exception:
+		return None
+
+class TokenManager(object):
+	def __init__(self, config):
+		self.config = config
+		self.refresh_token = config["refresh_token"]
+		self.access_token = None
+		self.expires_at = 0
+		self.refresh_at = 0
+		#no refresh is attempted before this time after a failed one
+		self.retry_at = 0
+		self.lock = threading.Lock()
+		#pooled connection to the token endpoint instead of a new one per payload
+		self.session = requests.Session()
+		self.refreshes = 0
+
+	def fetch(self):
+		config = self.config
+		body = render(config["body"], refresh_token=self.refresh_token)
+		if config["body_type"] == "json":
+			resp = self.session.request(config["method"], config["url"], headers=config["headers"], json=body)
+		else:
+			resp = self.session.request(config["method"], config["url"], headers=config["headers"], data=body)
+		resp.raise_for_status()
+		return resp.json()
+
+	def refresh(self):
+		config = self.config
+		access_token = None
+		for attempt in xrange(config["max_attempts"]):
+			try:
+				body = self.fetch()
+				access_token = jsonPath(body, config["access_token_path"])
+				if not access_token:
+					raise ValueError("no access token at %s" % config["access_token_path"])
+				break
+			except Exception as ex:
+				if attempt + 1 >= config["max_attempts"]:
+					print("Token refresh failed (%s)" % ex)
+					break
+				delay = min(config["backoff_max"], config["backoff_base"] * 2 ** attempt)
+				print("Token refresh failed (%s), retrying in %.1fs" % (ex, delay))
+				time.sleep(delay)
+		if not access_token:
+			#cool down so the next payloads go out with the current token (or none) instead of
+			#running the whole retry cycle again while every thread waits on the lock
+			self.retry_at = time.time() + config["backoff_max"]
+			print("Token refresh failed %d times, keeping the current token for %ss" % (config["max_attempts"], config["backoff_max"]))
+			return
+
+		expires_at = None
+		expires_in = jsonPath(body, config["expires_in_path"]) if config["expires_in_path"] else None
+		if expires_in:
+			expires_at = time.time() + float(expires_in)
+		if expires_at is None:
+			expires_at = jwtExpiry(access_token)
+		now = time.time()
+		if expires_at is None:
+			expires_at = now + config["default_lifetime"]
+
+		self.access_token = access_token
+		self.expires_at = expires_at
+		#a fixed margin would refresh on every payload for tokens that live less than it, so cap it
+		#at a tenth of this token's lifetime
+		self.refresh_at = expires_at - min(config["refresh_margin"], max(expires_at - now, 0) / 10.0)
+		#servers that rotate refresh tokens invalidate the old one, so always keep the newest
+		new_refresh_token = jsonPath(body, config["refresh_token_path"]) if config["refresh_token_path"] else None
+		if new_refresh_token:
+			self.refresh_token = new_refresh_token
+		self.refreshes += 1
+		print("Token has been Refreshed!")
+
+	def get(self, rejected=None):
+		#rejected is a token the target just answered 401 to
+		with self.lock:
+			if rejected is not None and rejected != self.access_token:
+				#another thread already replaced it
+				return self.access_token
+			if time.time() < self.retry_at:
+				return self.access_token
+			if rejected is None and self.access_token and time.time() < self.refresh_at:
+				return self.access_token
+			self.refresh()
+			return self.access_token
+
+tokens = TokenManager(loadConfig())
+
 def getNewToken():
-	headers = {"Cookie":"<COOKIE>"}
-	data = {"grant_type":"refresh_token",
-	"refresh_token":refresh_token}
-	url = "https://<URL>/<PATH>"
-	resp = requests.post(url=url, headers=headers,data=data)
-	print("Token has been Refreshed!")
-	return resp.json()['access_token']
+	return tokens.get()
 
 def tamper(payload, **kwargs):
-	done = False
-	while not done:
-		try:
-			access_token = getNewToken()
-			hdrs = kwargs.get("headers",{})
-			hdrs["Authorization"] = "Bearer "+access_token
-			break
-		except:
-			pass
+	threadData = getCurrentThreadData()
+	lastError = getattr(threadData, "lastHTTPError", None)
+	rejected = None
+	if lastError and lastError[1] == 401 and lastError[0] != getattr(threadData, "tokenRefreshUID", None):
+		#only react once to each rejected request
+		threadData.tokenRefreshUID = lastError[0]
+		rejected = getattr(threadData, "lastAccessToken", None)
+
+	access_token = tokens.get(rejected)
+	if access_token:
+		hdrs = kwargs.get("headers",{})
+		hdrs[tokens.config["header_name"]] = render(tokens.config["header_template"], access_token=access_token)
+		threadData.lastAccessToken = access_token
 
 	return payload